@@ -0,0 +1,191 @@
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from game_dice import DiceGame, ProbabilityCalculator, ProbabilityTable, RandomGenerator, np
+
+DEFAULT_DICE_COUNTS = [2, 10, 100, 1000]
+DEFAULT_FACE_COUNTS = [6, 100, 10000, 1000000]
+
+
+def make_dice(dice_count, faces_count, seed=0):
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        return [rng.integers(0, faces_count * 2, size=faces_count).tolist() for _ in range(dice_count)]
+    generator = random.Random(seed)
+    return [[generator.randrange(faces_count * 2) for _ in range(faces_count)] for _ in range(dice_count)]
+
+
+def bench_calculate_probability(dice):
+    return lambda: ProbabilityCalculator.calculate_probability(dice[0], dice[1])
+
+
+def bench_table_generate(dice):
+    table = ProbabilityTable(ProbabilityCalculator())
+    dice_sets = {i: faces for i, faces in enumerate(dice)}
+    return lambda: table.generate(dice_sets)
+
+
+def bench_generate_hmac(dice, calls=10000):
+    key = RandomGenerator.generate_hmac_key()
+
+    def run():
+        for value in range(calls):
+            RandomGenerator.generate_hmac(key, value % 6)
+    return run
+
+
+@contextlib.contextmanager
+def scripted_stdin(script):
+    saved = sys.stdin
+    sys.stdin = io.StringIO(script)
+    try:
+        yield
+    finally:
+        sys.stdin = saved
+
+
+def bench_game_match(dice):
+    # Guess 0 and pick the first die every round, then decline the replay.
+    script = "0\n1\n" * 3 + "n\n"
+
+    def run():
+        game = DiceGame(dice)
+        with contextlib.redirect_stdout(io.StringIO()), scripted_stdin(script):
+            asyncio.run(game.start())
+    return run
+
+
+# Each benchmark runs over part of the grid: "pair" cases use two dice at every face count,
+# "once" cases run a single time, and "grid" cases cover every dice and face count within the limits.
+BENCHMARKS = {
+    "calculate_probability": (bench_calculate_probability, "pair"),
+    "table_generate": (bench_table_generate, "grid"),
+    "generate_hmac": (bench_generate_hmac, "once"),
+    "game_match": (bench_game_match, "grid"),
+}
+
+
+def grid_cases(name, coverage, dice_counts, face_counts, limits):
+    if coverage == "once":
+        return [(2, 6)]
+    if coverage == "pair":
+        return [(2, faces_count) for faces_count in face_counts]
+    cases = []
+    for faces_count in face_counts:
+        for dice_count in dice_counts:
+            if dice_count * faces_count > limits.max_total_faces:
+                continue
+            if name == "table_generate" and dice_count > limits.max_table_dice:
+                continue
+            cases.append((dice_count, faces_count))
+    return cases
+
+
+def measure(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+        if timings[-1] > 1.0:
+            break
+
+    # Memory is measured on a separate run so tracemalloc's overhead does not skew the timings.
+    tracemalloc.start()
+    try:
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(timings), peak
+
+
+def run_suite(dice_counts, face_counts, limits, repeat=3, selected=None, log=sys.stderr):
+    cases = {}
+    for name, (factory, coverage) in BENCHMARKS.items():
+        if selected and name not in selected:
+            continue
+        for dice_count, faces_count in grid_cases(name, coverage, dice_counts, face_counts, limits):
+            case = f"{name}/dice={dice_count}/faces={faces_count}"
+            seconds, peak = measure(factory(make_dice(dice_count, faces_count)), repeat)
+            cases[case] = {"seconds": seconds, "peak_bytes": peak}
+            print(f"{case}: {seconds * 1000:.3f} ms, peak {peak / 1024:.1f} KiB", file=log)
+    return {"python": platform.python_version(), "numpy": getattr(np, "__version__", None), "cases": cases}
+
+
+def compare(baseline, current, threshold, memory_threshold, min_delta=0.0):
+    # A slowdown must exceed both the relative threshold and min_delta seconds, so sub-millisecond
+    # cases do not fail the gate on timer noise.
+    regressions, missing = [], []
+    for case, before in baseline["cases"].items():
+        after = current["cases"].get(case)
+        if after is None:
+            missing.append(case)
+            continue
+        if after["seconds"] - before["seconds"] > max(before["seconds"] * threshold, min_delta):
+            regressions.append(f"{case}: time {before['seconds'] * 1000:.3f} ms -> {after['seconds'] * 1000:.3f} ms")
+        if after["peak_bytes"] > before["peak_bytes"] * (1 + memory_threshold):
+            regressions.append(f"{case}: peak memory {before['peak_bytes'] / 1024:.1f} KiB -> {after['peak_bytes'] / 1024:.1f} KiB")
+    return regressions, missing
+
+
+def is_narrowed(args):
+    # A run limited to part of the suite is expected to leave baseline cases out.
+    return bool(args.bench) or args.dice != DEFAULT_DICE_COUNTS or args.faces != DEFAULT_FACE_COUNTS
+
+
+def parse_counts(value):
+    return [int(count) for count in value.split(',')]
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Benchmark the game hot paths and gate on regressions')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    for command, help_text in (('run', 'Run the benchmarks and write a JSON baseline'), ('compare', 'Run (or load) results and compare them with a baseline')):
+        command_parser = subparsers.add_parser(command, help=help_text)
+        command_parser.add_argument('--dice', type=parse_counts, default=DEFAULT_DICE_COUNTS, help='Comma-separated dice counts')
+        command_parser.add_argument('--faces', type=parse_counts, default=DEFAULT_FACE_COUNTS, help='Comma-separated face counts')
+        command_parser.add_argument('--bench', action='append', choices=sorted(BENCHMARKS), help='Only run this benchmark (repeatable)')
+        command_parser.add_argument('--repeat', type=int, default=3, help='Timed runs per case; the fastest is kept')
+        command_parser.add_argument('--max-table-dice', type=int, default=100, help='Largest dice count for the rendered table')
+        command_parser.add_argument('--max-total-faces', type=int, default=20000000, help='Skip cases with more dice x faces than this')
+    subparsers.choices['run'].add_argument('--output', default='benchmark_baseline.json', help='Where to write the results')
+    subparsers.choices['compare'].add_argument('baseline', help='Baseline JSON written by the run command')
+    subparsers.choices['compare'].add_argument('--current', help='Compare these saved results instead of running the suite')
+    subparsers.choices['compare'].add_argument('--threshold', type=float, default=0.25, help='Allowed relative slowdown, e.g. 0.25 for 25%%')
+    subparsers.choices['compare'].add_argument('--memory-threshold', type=float, default=0.25, help='Allowed relative growth of peak memory')
+    subparsers.choices['compare'].add_argument('--min-delta-ms', type=float, default=1.0, help='Ignore slowdowns smaller than this many milliseconds')
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        results = run_suite(args.dice, args.faces, args, args.repeat, args.bench)
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+        print(f"Wrote {len(results['cases'])} cases to {args.output}")
+        sys.exit()
+
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    if args.current:
+        with open(args.current) as current_file:
+            current = json.load(current_file)
+    else:
+        current = run_suite(args.dice, args.faces, args, args.repeat, args.bench)
+
+    regressions, missing = compare(baseline, current, args.threshold, args.memory_threshold, args.min_delta_ms / 1000)
+    for regression in regressions:
+        print(f"Regression: {regression}")
+    # A renamed or newly skipped case must not pass the gate, unless the run was deliberately narrowed.
+    narrowed = is_narrowed(args)
+    for case in missing:
+        print(f"{'Not run' if narrowed else 'Missing'}: {case}")
+    print(f"Compared {len(current['cases'])} cases, {len(regressions)} regressions, {len(missing)} baseline cases not run.")
+    sys.exit(1 if regressions or (missing and not narrowed) else 0)
@@ -0,0 +1,303 @@
+import argparse
+import hashlib
+import mmap
+import os
+import secrets
+import struct
+import sys
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+NONCE_SIZE = 16
+TRANSCRIPT_MAGIC = b"DICETRN3"
+# A match record carries the number of leaves (three per round) and the range of the first-move draw.
+MATCH_RECORD = struct.Struct(">c16s32sII")
+ROUND_RECORD = struct.Struct(">c16sHbb" + f"Iq{NONCE_SIZE}s" * 3 + "qq")
+# Every match is closed with the number of rounds it logged, including matches the player left early.
+END_RECORD = struct.Struct(">c16sH")
+LEAF_LABEL = struct.Struct(">Iq")
+
+
+def leaf_hash(match_id, leaf_index, value, nonce):
+    return hashlib.sha3_256(b"\x00" + match_id + LEAF_LABEL.pack(leaf_index, value) + nonce).digest()
+
+
+def node_hash(left, right):
+    return hashlib.sha3_256(b"\x01" + left + right).digest()
+
+
+class MerkleTree:
+    def __init__(self, leaves):
+        # levels[0] holds the leaves; an odd node at the end of a level is promoted unchanged.
+        self.levels = [list(leaves)]
+        while len(self.levels[-1]) > 1:
+            level = self.levels[-1]
+            parents = [node_hash(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2:
+                parents.append(level[-1])
+            self.levels.append(parents)
+
+    @property
+    def root(self):
+        return self.levels[-1][0]
+
+    def proof(self, leaf_index):
+        path = []
+        index = leaf_index
+        for level in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(level):
+                path.append((level[sibling], sibling < index))
+            index //= 2
+        return path
+
+    @staticmethod
+    def verify_proof(root, leaf, path):
+        current = leaf
+        for sibling, sibling_is_left in path:
+            current = node_hash(sibling, current) if sibling_is_left else node_hash(current, sibling)
+        return current == root
+
+
+class TranscriptWriter:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(TRANSCRIPT_MAGIC)
+            self.file.flush()
+
+    def write_match(self, match_id, root, leaves, total_choices):
+        with self.lock:
+            self.file.write(MATCH_RECORD.pack(b"M", match_id, root, len(leaves), total_choices) + b"".join(leaves))
+            self.file.flush()
+
+    def write_round(self, match_id, round_index, guess, user_first, draws, user_total, computer_total):
+        fields = []
+        for leaf_index, value, nonce in draws:
+            fields.extend((leaf_index, value, nonce))
+        with self.lock:
+            self.file.write(ROUND_RECORD.pack(b"R", match_id, round_index, guess, user_first, *fields, user_total, computer_total))
+            self.file.flush()
+
+    def write_end(self, match_id, rounds):
+        with self.lock:
+            self.file.write(END_RECORD.pack(b"E", match_id, rounds))
+            self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class MerkleCommitments:
+    def __init__(self, random_generator, transcript):
+        self.random_generator = random_generator
+        self.transcript = transcript
+        self.match_id = None
+        self.match_open = False
+
+    def begin_match(self, total_rounds, total_choices):
+        # Every secret of the match is drawn and committed up front; only the root is shown.
+        self.match_id = uuid.uuid4().bytes
+        self.limits = [total_choices, 6, 6] * total_rounds
+        self.values = [self.random_generator.generate_random(limit) for limit in self.limits]
+        self.nonces = [secrets.token_bytes(NONCE_SIZE) for _ in self.values]
+        leaves = [leaf_hash(self.match_id, i, value, nonce) for i, (value, nonce) in enumerate(zip(self.values, self.nonces))]
+        self.tree = MerkleTree(leaves)
+        self.next_leaf = 0
+        self.round_index = 0
+        self.round_draws = []
+        self.guess = -1
+        self.transcript.write_match(self.match_id, self.tree.root, leaves, total_choices)
+        self.match_open = True
+        return f"I have committed to every secret value of this match. (Match={self.match_id.hex()}, Merkle root={self.tree.root.hex()})"
+
+    def draw(self, max_value):
+        leaf_index = self.next_leaf
+        if self.limits[leaf_index] != max_value:
+            raise ValueError(f"Commitment #{leaf_index} was drawn below {self.limits[leaf_index]}, not {max_value}.")
+        self.next_leaf += 1
+        self.round_draws.append((leaf_index, self.values[leaf_index], self.nonces[leaf_index]))
+        return self.values[leaf_index], f"Commitment #{leaf_index}"
+
+    def note_guess(self, guess):
+        self.guess = guess
+
+    def record_round(self, user_first, user_total, computer_total):
+        self.transcript.write_round(self.match_id, self.round_index, self.guess, user_first, self.round_draws, user_total, computer_total)
+        self.round_index += 1
+        self.round_draws = []
+
+    def end_match(self):
+        if self.match_open:
+            self.transcript.write_end(self.match_id, self.round_index)
+            self.match_open = False
+
+    def reveal(self, message_handler):
+        return f"Every round is logged to {self.transcript.path} for verification against Merkle root {self.tree.root.hex()}."
+
+
+def iter_records(buffer):
+    if buffer[:len(TRANSCRIPT_MAGIC)] != TRANSCRIPT_MAGIC:
+        raise ValueError("Not a dice game transcript.")
+    offset = len(TRANSCRIPT_MAGIC)
+    while offset < len(buffer):
+        kind = buffer[offset:offset + 1]
+        record = {b"M": MATCH_RECORD, b"R": ROUND_RECORD, b"E": END_RECORD}.get(kind)
+        if record is not None and offset + record.size > len(buffer):
+            raise ValueError("Transcript ends in the middle of a record.")
+        if kind == b"M":
+            _, match_id, root, leaf_count, total_choices = MATCH_RECORD.unpack_from(buffer, offset)
+            start = offset + MATCH_RECORD.size
+            leaves = [bytes(buffer[start + i * 32:start + (i + 1) * 32]) for i in range(leaf_count)]
+            offset = start + leaf_count * 32
+            if offset > len(buffer):
+                raise ValueError("Transcript ends in the middle of a record.")
+            yield kind, match_id, (root, leaves, total_choices)
+        elif kind == b"R":
+            fields = ROUND_RECORD.unpack_from(buffer, offset)
+            offset += ROUND_RECORD.size
+            yield kind, fields[1], fields[2:]
+        elif kind == b"E":
+            _, match_id, rounds = END_RECORD.unpack_from(buffer, offset)
+            offset += END_RECORD.size
+            yield kind, match_id, rounds
+        else:
+            raise ValueError(f"Corrupt transcript record at byte {offset}.")
+
+
+def check_round(match_id, leaves, fields, total_choices):
+    round_index, guess, user_first = fields[0], fields[1], fields[2]
+    draws = [fields[3 + i * 3:6 + i * 3] for i in range(3)]
+    user_total, computer_total = fields[12], fields[13]
+
+    # Round r must reveal exactly leaves 3r, 3r + 1 and 3r + 2, so no committed value can be swapped for another.
+    for i, ((leaf_index, value, nonce), limit) in enumerate(zip(draws, (total_choices, 6, 6))):
+        if leaf_index != round_index * 3 + i:
+            return f"round {round_index}: reveals commitment #{leaf_index} instead of #{round_index * 3 + i}"
+        if leaf_index >= len(leaves) or leaf_hash(match_id, leaf_index, value, nonce) != leaves[leaf_index]:
+            return f"round {round_index}: commitment #{leaf_index} does not match its reveal"
+        if not 0 <= value < limit:
+            return f"round {round_index}: commitment #{leaf_index} is out of range"
+    if not 0 <= guess < total_choices:
+        return f"round {round_index}: guess {guess} is out of range"
+    if bool(user_first) != (guess == draws[0][1]):
+        return f"round {round_index}: first move does not follow the guess"
+    return None
+
+
+def verify_partition(path, partition, partitions):
+    # Each worker scans the whole file but only checks the matches hashed to its partition,
+    # so memory per worker is bounded by its own share of open matches.
+    matches, rounds, failures = 0, 0, []
+    commitments, logged_rounds, ended = {}, {}, set()
+    with open(path, "rb") as transcript, mmap.mmap(transcript.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        for kind, match_id, payload in iter_records(buffer):
+            if match_id[0] % partitions != partition:
+                continue
+            if kind == b"M":
+                root, leaves, total_choices = payload
+                matches += 1
+                if MerkleTree(leaves).root != root:
+                    failures.append((match_id.hex(), "leaves do not hash to the published Merkle root"))
+                if not leaves or len(leaves) % 3:
+                    failures.append((match_id.hex(), f"commits to {len(leaves)} values, not three per round"))
+                commitments[match_id] = (leaves, total_choices)
+                logged_rounds[match_id] = 0
+                continue
+            if kind == b"E":
+                if match_id not in commitments:
+                    failures.append((match_id.hex(), "match closed before its commitment"))
+                elif payload != logged_rounds[match_id]:
+                    failures.append((match_id.hex(), f"closed after {payload} rounds but logs {logged_rounds[match_id]}"))
+                ended.add(match_id)
+                continue
+            rounds += 1
+            if match_id not in commitments:
+                problem = "round logged before its match commitment"
+            elif match_id in ended:
+                problem = f"round {payload[0]} logged after the match was closed"
+            elif payload[0] != logged_rounds[match_id]:
+                problem = f"round {payload[0]} logged where round {logged_rounds[match_id]} was expected"
+            else:
+                leaves, total_choices = commitments[match_id]
+                problem = check_round(match_id, leaves, payload, total_choices)
+                logged_rounds[match_id] += 1
+            if problem:
+                failures.append((match_id.hex(), problem))
+
+    # A player may leave early, so a closed match can log fewer rounds; only an unclosed match is suspect.
+    for match_id, (leaves, _) in commitments.items():
+        if match_id not in ended:
+            failures.append((match_id.hex(), f"has no closing record after {logged_rounds[match_id]} of {len(leaves) // 3} rounds"))
+    return matches, rounds, failures
+
+
+def verify_transcript(path, workers=None):
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) as executor:
+        results = list(executor.map(verify_partition, [path] * workers, range(workers), [workers] * workers))
+    matches = sum(result[0] for result in results)
+    rounds = sum(result[1] for result in results)
+    failures = [failure for result in results for failure in result[2]]
+    return matches, rounds, failures
+
+
+def prove_round(path, match_id, round_index):
+    leaves, round_fields = None, None
+    with open(path, "rb") as transcript, mmap.mmap(transcript.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        for kind, record_match, payload in iter_records(buffer):
+            if record_match != match_id:
+                continue
+            if kind == b"M":
+                root, leaves, _ = payload
+            elif kind == b"R" and payload[0] == round_index:
+                round_fields = payload
+                break
+    if leaves is None or round_fields is None:
+        raise ValueError("The transcript has no such match and round.")
+
+    tree = MerkleTree(leaves)
+    proofs = []
+    for i in range(3):
+        leaf_index, value, nonce = round_fields[3 + i * 3:6 + i * 3]
+        proofs.append((leaf_index, value, nonce, tree.proof(leaf_index)))
+    return root, proofs
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Verify dice game transcripts against their Merkle commitments')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    verify_parser = subparsers.add_parser('verify', help='Re-check every logged round in parallel')
+    verify_parser.add_argument('transcript', help='Path to a binary transcript')
+    verify_parser.add_argument('--workers', type=int, help='Number of worker processes (defaults to the CPU count)')
+    prove_parser = subparsers.add_parser('prove', help='Print inclusion proofs for one disputed round')
+    prove_parser.add_argument('transcript', help='Path to a binary transcript')
+    prove_parser.add_argument('match', help='Match id shown at the start of the match')
+    prove_parser.add_argument('round', type=int, help='Round number (starting at 1)')
+    prove_parser.add_argument('--root', help='Merkle root shown to the player, checked instead of the logged one')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'verify':
+            matches, rounds, failures = verify_transcript(args.transcript, args.workers)
+            print(f"Verified {rounds} rounds across {matches} matches.")
+            for match_id, problem in failures:
+                print(f"Match {match_id}: {problem}")
+            sys.exit(1 if failures else 0)
+
+        root, proofs = prove_round(args.transcript, bytes.fromhex(args.match), args.round - 1)
+        if args.root:
+            root = bytes.fromhex(args.root)
+        valid = True
+        for leaf_index, value, nonce, path in proofs:
+            ok = MerkleTree.verify_proof(root, leaf_hash(bytes.fromhex(args.match), leaf_index, value, nonce), path)
+            valid = valid and ok
+            print(f"Commitment #{leaf_index}: value={value} nonce={nonce.hex()} proof={[sibling.hex() for sibling, _ in path]} {'valid' if ok else 'INVALID'}")
+        sys.exit(0 if valid else 1)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,149 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+
+LIBRARY_MAGIC = b"DICELIB1"
+# Header: magic, number of dice, byte offset of the index. The index sits after the packed
+# little-endian int32 faces so the converter can stream faces without knowing the dice count.
+HEADER = struct.Struct("<8sQQ")
+INDEX_ENTRY = struct.Struct("<QQ")
+FACE_SIZE = 4
+
+
+def _to_library_order(faces):
+    if sys.byteorder == "big":
+        faces.byteswap()
+    return faces
+
+
+class DiceLibrary:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError(f"{path} is empty, not a dice library.")
+        if len(self.buffer) < HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is too short to be a dice library.")
+        magic, self.dice_count, self.index_offset = HEADER.unpack_from(self.buffer, 0)
+        if magic != LIBRARY_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a dice library.")
+        if self.index_offset + self.dice_count * INDEX_ENTRY.size > len(self.buffer):
+            self.close()
+            raise ValueError(f"{path} is truncated: its index runs past the end of the file.")
+
+    def __len__(self):
+        return self.dice_count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if getattr(self, "buffer", None) is not None:
+            self.buffer.close()
+            self.buffer = None
+        self.file.close()
+
+    def entry(self, index):
+        if not 0 <= index < self.dice_count:
+            raise IndexError(f"The library has no die {index + 1}.")
+        return INDEX_ENTRY.unpack_from(self.buffer, self.index_offset + index * INDEX_ENTRY.size)
+
+    def check_entry(self, index, min_faces=6):
+        offset, face_count = self.entry(index)
+        if face_count < min_faces:
+            return f"die {index + 1} has {face_count} faces, at least {min_faces} are required"
+        if offset < HEADER.size or offset % FACE_SIZE or offset + face_count * FACE_SIZE > self.index_offset:
+            return f"die {index + 1} points outside the face data"
+        return None
+
+    def iter_problems(self, min_faces=6):
+        # Only the index is read, so a malformed die is reported without touching any faces.
+        for index in range(self.dice_count):
+            problem = self.check_entry(index, min_faces)
+            if problem:
+                yield index, problem
+
+    def faces(self, index):
+        offset, face_count = self.entry(index)
+        faces = array("i")
+        faces.frombytes(self.buffer[offset:offset + face_count * FACE_SIZE])
+        return _to_library_order(faces)
+
+    def select(self, indices):
+        return [self.faces(index) for index in indices]
+
+
+def convert(text_path, library_path):
+    # Dice are comma-separated faces, separated from each other by spaces or new lines,
+    # the same format the game accepts on the command line.
+    index = []
+    with open(text_path) as source:
+        # Write to a temporary file first so a failed conversion never leaves an empty but valid library behind.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(library_path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as library:
+                library.write(HEADER.pack(LIBRARY_MAGIC, 0, 0))
+                offset = HEADER.size
+                for line_number, line in enumerate(source, start=1):
+                    for group in line.split():
+                        try:
+                            faces = array("i", map(int, group.split(',')))
+                        except (ValueError, OverflowError):
+                            raise ValueError(f"Line {line_number}: '{group}' is not a comma-separated list of 32-bit integers.")
+                        _to_library_order(faces).tofile(library)
+                        index.append((offset, len(faces)))
+                        offset += len(faces) * FACE_SIZE
+
+                for entry in index:
+                    library.write(INDEX_ENTRY.pack(*entry))
+                library.seek(0)
+                library.write(HEADER.pack(LIBRARY_MAGIC, len(index), offset))
+            # mkstemp creates the file as 0600; give the library the permissions a plain open() would.
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_path, 0o666 & ~umask)
+            os.replace(tmp_path, library_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    return len(index)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Build and check binary dice libraries')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    convert_parser = subparsers.add_parser('convert', help='Convert comma-separated dice into a binary library')
+    convert_parser.add_argument('source', help='Text file of dice, e.g. "3,4,7,7,4,5 7,4,5,6,3,5"')
+    convert_parser.add_argument('library', help='Path of the binary library to write')
+    validate_parser = subparsers.add_parser('validate', help='Report malformed dice in a binary library')
+    validate_parser.add_argument('library', help='Path of the binary library to check')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'convert':
+            print(f"Wrote {convert(args.source, args.library)} dice to {args.library}")
+            sys.exit()
+
+        with DiceLibrary(args.library) as library:
+            problems = 0
+            for index, problem in library.iter_problems():
+                problems += 1
+                print(f"Error: {problem}")
+            print(f"Checked {len(library)} dice, {problems} malformed.")
+        sys.exit(1 if problems else 0)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
@@ -1,28 +1,53 @@
 import argparse
+import asyncio
 import hmac
 import hashlib
+import json
 import os
+import tempfile
+import threading
 import secrets
 import sys
 import random
-from tabulate import tabulate
+from abc import ABC, abstractmethod
+from array import array
+from bisect import bisect_right
+from collections import Counter, OrderedDict
+from fractions import Fraction
+from itertools import islice
+from heapq import nlargest
+from math import comb
 from colorama import Fore, Style, init
+from commitments import MerkleCommitments, TranscriptWriter
+from dice_library import DiceLibrary
 
-# Initialize colorama
-init(autoreset=True)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class Palette:
+    # In plain mode every color is an empty string, so no ANSI codes are produced at all.
+    colors = ("RED", "GREEN", "YELLOW", "BLUE", "MAGENTA", "CYAN")
+
+    def __init__(self, color=True):
+        for name in self.colors:
+            setattr(self, name, getattr(Fore, name) if color else "")
+        self.RESET = Style.RESET_ALL if color else ""
 
 class MessageHandler:
-    def __init__(self):
+    def __init__(self, palette=None):
+        self.palette = p = palette or Palette()
         self.messages = {
-            "welcome": f"{Fore.MAGENTA}🎲 Welcome to the General Non-Transitive Dice Game! 🎲{Style.RESET_ALL}\nWe will play with {{dice_count}} dice(s) and {{faces_count}} faces per dice.",
-            "first_move": f"{Fore.MAGENTA}Let's determine who makes the first move!.{Style.RESET_ALL} Exit the game anytime (x).{Fore.YELLOW}\nGuess my selection (from 0 to 3):{Style.RESET_ALL}",
-            "replay": f"{Fore.MAGENTA}Would you like to play again? (Y/N):{Style.RESET_ALL}",
-            "win": f"{Fore.GREEN}You win this round! 🎉{Style.RESET_ALL}",
-            "lose": f"{Fore.RED}I win this round! Better luck next time!{Style.RESET_ALL}",
-            "draw": f"{Fore.MAGENTA}It's a draw! 🤝{Style.RESET_ALL}",
+            "welcome": f"{p.MAGENTA}🎲 Welcome to the General Non-Transitive Dice Game! 🎲{p.RESET}\nWe will play with {{dice_count}} dice(s) and {{faces_count}} faces per dice.",
+            "first_move": f"{p.MAGENTA}Let's determine who makes the first move!.{p.RESET} Exit the game anytime (x).{p.YELLOW}\nGuess my selection (from 0 to 3):{p.RESET}",
+            "replay": f"{p.MAGENTA}Would you like to play again? (Y/N):{p.RESET}",
+            "win": f"{p.GREEN}You win this round! 🎉{p.RESET}",
+            "lose": f"{p.RED}I win this round! Better luck next time!{p.RESET}",
+            "draw": f"{p.MAGENTA}It's a draw! 🤝{p.RESET}",
             "reveal_hmac": "Here's the HMAC key for verification: {hmac_key}",
-            "final_result_win": f"{Fore.GREEN}You won {{user_wins}} out of {{total_rounds}} rounds! 🏆{Style.RESET_ALL}",
-            "final_result_lose": f"{Fore.RED}🏆 I won 2 out of 3 rounds 👎!{Style.RESET_ALL}",
+            "final_result_win": f"{p.GREEN}You won {{user_wins}} out of {{total_rounds}} rounds! 🏆{p.RESET}",
+            "final_result_lose": f"{p.RED}🏆 I won 2 out of 3 rounds 👎!{p.RESET}",
         }
 
     def get_message(self, message_type, **kwargs):
@@ -40,8 +65,36 @@ class RandomGenerator:
     @staticmethod
     def generate_hmac(key, value):
         return hmac.new(key, str(value).encode(), hashlib.sha3_256).hexdigest()
+
+class HmacCommitments:
+    def __init__(self, random_generator):
+        self.random_generator = random_generator
+        self.hmac_key = random_generator.generate_hmac_key()
+
+    def begin_match(self, total_rounds, total_choices):
+        return None
+
+    def draw(self, max_value):
+        value = self.random_generator.generate_random(max_value)
+        return value, f"HMAC={self.random_generator.generate_hmac(self.hmac_key, value)}"
+
+    def note_guess(self, guess):
+        pass
+
+    def record_round(self, user_first, user_total, computer_total):
+        pass
+
+    def end_match(self):
+        pass
+
+    def reveal(self, message_handler):
+        return message_handler.get_message("reveal_hmac", hmac_key=self.hmac_key.hex())
     
 class GameValidations:
+    # Faces are stored as 32-bit integers.
+    min_face = -2**31
+    max_face = 2**31 - 1
+
     def __init__(self):
         pass
     
@@ -62,12 +115,36 @@ class GameValidations:
             for faces in dice_sets:
                 if len(faces) < 6:
                     raise ValueError("Each dice must have at least 6 faces.")
-        
-                return dice_sets
+                if min(faces) < self.min_face or max(faces) > self.max_face:
+                    raise ValueError(f"Face values must be between {self.min_face} and {self.max_face}.")
+            return dice_sets
         except ValueError as e:
             print(f"Error: {e}")
             sys.exit(1)
 
+    def validate_library_selection(self, library_path, selection):
+        try:
+            indices = [int(number) - 1 for number in selection.split(',')] if selection else []
+        except ValueError:
+            print("Error: Dice selection is invalid. Please use die numbers, e.g. '1,4,7'.")
+            sys.exit(1)
+        try:
+            with DiceLibrary(library_path) as library:
+                if selection is None:
+                    indices = list(range(len(library)))
+                if len(indices) < 2:
+                    raise ValueError("You need at least 2 dice sets to play.")
+                for index in indices:
+                    if not 0 <= index < len(library):
+                        raise ValueError(f"The library has {len(library)} dice, there is no die {index + 1}.")
+                    problem = library.check_entry(index)
+                    if problem:
+                        raise ValueError(f"Each dice must have at least 6 faces and valid data: {problem}.")
+                return library.select(indices)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
     def validate_exit(self, user_input):
         if user_input.lower() == 'x':
             print("Exiting the game...")
@@ -94,12 +171,45 @@ class GameValidations:
     
 class ProbabilityCalculator:
     @staticmethod
-    def calculate_probability(user_dice, computer_dice, trials=10000):
+    def as_die(dice):
+        return dice if isinstance(dice, Die) else Die(dice)
+
+    @staticmethod
+    def count_outcomes(user_die, computer_die):
+        # A single merge pass over both histograms counts, for every distinct user face,
+        # how many computer faces are strictly lower (wins) and strictly higher (losses).
+        user_wins, computer_wins = 0, 0
+        below = 0
+        computer_values, computer_bounds = computer_die.values, computer_die.bounds
+        distinct_count = len(computer_values)
+        computer_count = len(computer_die)
+
+        for t, face in enumerate(user_die.values):
+            while below < distinct_count and computer_values[below] < face:
+                below += 1
+            not_above = below + 1 if below < distinct_count and computer_values[below] == face else below
+            repeats = user_die.bounds[t + 1] - user_die.bounds[t]
+            user_wins += repeats * computer_bounds[below]
+            computer_wins += repeats * (computer_count - computer_bounds[not_above])
+
+        draws = len(user_die) * computer_count - user_wins - computer_wins
+        return user_wins, computer_wins, draws
+
+    @classmethod
+    def exact_probability(cls, user_dice, computer_dice):
+        user_dice, computer_dice = cls.as_die(user_dice), cls.as_die(computer_dice)
+        user_wins, computer_wins, draws = cls.count_outcomes(user_dice, computer_dice)
+        total_games = len(user_dice) * len(computer_dice)
+        return Fraction(user_wins, total_games), Fraction(computer_wins, total_games), Fraction(draws, total_games)
+
+    @classmethod
+    def simulate_probability(cls, user_dice, computer_dice, trials):
+        user_dice, computer_dice = cls.as_die(user_dice), cls.as_die(computer_dice)
         user_wins, computer_wins, draws = 0, 0, 0
         
         for _ in range(trials):
-            user_roll = random.choice(user_dice)
-            computer_roll = random.choice(computer_dice)
+            user_roll = user_dice.sample()
+            computer_roll = computer_dice.sample()
             
             if user_roll > computer_roll:
                 user_wins += 1
@@ -113,35 +223,475 @@ class ProbabilityCalculator:
         computer_probability = (computer_wins / total_games) * 100
         
         return user_probability, computer_probability
-    
+
+    @classmethod
+    def calculate_probability(cls, user_dice, computer_dice, trials=None):
+        if trials is not None:
+            return cls.simulate_probability(user_dice, computer_dice, trials)
+
+        user_probability, computer_probability, _ = cls.exact_probability(user_dice, computer_dice)
+        return float(user_probability * 100), float(computer_probability * 100)
+
+    @staticmethod
+    def score_die(dice, offsets=6):
+        # A round's score is a face plus a uniform 0-5 offset, so the score histogram is the face
+        # histogram convolved with a box of width 6. A box needs only a running sum, which beats
+        # an FFT; dense face ranges use a cumulative-sum window, spread-out ones a sparse sum.
+        die = ProbabilityCalculator.as_die(dice)
+        if np is None:
+            histogram = Counter()
+            for t, value in enumerate(die.values):
+                for offset in range(offsets):
+                    histogram[value + offset] += die.bounds[t + 1] - die.bounds[t]
+            scores = sorted(histogram)
+            return Die.from_histogram(scores, [histogram[score] for score in scores])
+
+        values = np.frombuffer(die.values, dtype=np.int64)
+        counts = np.diff(np.frombuffer(die.bounds, dtype=np.int64))
+        span = int(values[-1] - values[0]) + offsets
+        if span <= 4 * offsets * len(values):
+            dense = np.zeros(span + 1, dtype=np.int64)
+            dense[values - values[0] + 1] = counts
+            cumulative = np.cumsum(dense)
+            window = np.arange(1, span + 1)
+            scores = cumulative[window] - cumulative[np.maximum(window - offsets, 0)]
+            present = np.nonzero(scores)[0]
+            return Die.from_histogram(present + values[0], scores[present])
+
+        shifted = (values[:, None] + np.arange(offsets)).ravel()
+        distinct, positions = np.unique(shifted, return_inverse=True)
+        # Weighted bincount sums in float64, which is exact for counts below 2**53.
+        scores = np.bincount(positions.ravel(), weights=np.repeat(counts, offsets)).astype(np.int64)
+        return Die.from_histogram(distinct, scores)
+
+    @classmethod
+    def round_matrix(cls, dice_list, offsets=6):
+        return cls.win_matrix([cls.score_die(dice, offsets) for dice in dice_list])
+
+    @classmethod
+    def win_matrix(cls, dice_list):
+        dice_list = [cls.as_die(dice) for dice in dice_list]
+        face_counts = [len(die) for die in dice_list]
+        if np is not None:
+            wins, losses = cls._vectorized_counts(dice_list)
+        else:
+            wins, losses = cls._pairwise_counts(dice_list)
+        return OutcomeMatrix(wins, losses, face_counts)
+
+    @classmethod
+    def _pairwise_counts(cls, dice_list):
+        dice_count = len(dice_list)
+        wins = [[0] * dice_count for _ in range(dice_count)]
+        losses = [[0] * dice_count for _ in range(dice_count)]
+        # P(A beats B) is P(B loses to A), so only the upper triangle is counted.
+        for i in range(dice_count):
+            for j in range(i, dice_count):
+                user_wins, computer_wins, _ = cls.count_outcomes(dice_list[i], dice_list[j])
+                wins[i][j], losses[i][j] = user_wins, computer_wins
+                wins[j][i], losses[j][i] = computer_wins, user_wins
+        return wins, losses
+
+    @staticmethod
+    def pack_faces(dice_list):
+        values = [np.frombuffer(die.values, dtype=np.int64) for die in dice_list]
+        bounds = [np.frombuffer(die.bounds, dtype=np.int64) for die in dice_list]
+        sizes = np.asarray([len(die) for die in dice_list], dtype=np.int64)
+        offsets = np.concatenate(([0], np.cumsum([len(die_values) for die_values in values])))
+        all_values = np.concatenate(values)
+        all_counts = np.concatenate([np.diff(die_bounds) for die_bounds in bounds])
+        return values, bounds, sizes, offsets, all_values, all_counts
+
+    @staticmethod
+    def column_counts(packed, j):
+        # Die j is counted against every die i >= j in one searchsorted call over the concatenated
+        # distinct faces, weighted by how often each face repeats. Returns how often each die i
+        # beats die j and how often it loses.
+        values, bounds, sizes, offsets, all_values, all_counts = packed
+        tail_values = all_values[offsets[j]:]
+        tail_counts = all_counts[offsets[j]:]
+        starts = offsets[j:-1] - offsets[j]
+        below = np.add.reduceat(tail_counts * bounds[j][np.searchsorted(values[j], tail_values, side="left")], starts)
+        not_above = np.add.reduceat(tail_counts * bounds[j][np.searchsorted(values[j], tail_values, side="right")], starts)
+        return below, sizes[j:] * sizes[j] - not_above
+
+    @classmethod
+    def _vectorized_counts(cls, dice_list):
+        dice_count = len(dice_list)
+        packed = cls.pack_faces(dice_list)
+        wins = np.zeros((dice_count, dice_count), dtype=np.int64)
+        losses = np.zeros((dice_count, dice_count), dtype=np.int64)
+
+        # Only the lower triangle is counted; the mirrored half follows from symmetry.
+        for j in range(dice_count):
+            below, above = cls.column_counts(packed, j)
+            wins[j:, j], losses[j:, j] = below, above
+            wins[j, j:], losses[j, j:] = above, below
+        return wins, losses
+
+class OutcomeMatrix:
+    def __init__(self, wins, losses, face_counts):
+        self.wins = wins
+        self.losses = losses
+        self.face_counts = face_counts
+        self.size = len(face_counts)
+
+    def total(self, user_index, computer_index):
+        return self.face_counts[user_index] * self.face_counts[computer_index]
+
+    def counts(self, user_index, computer_index):
+        user_wins = int(self.wins[user_index][computer_index])
+        computer_wins = int(self.losses[user_index][computer_index])
+        draws = self.total(user_index, computer_index) - user_wins - computer_wins
+        return user_wins, computer_wins, draws
+
+    def exact(self, user_index, computer_index):
+        total_games = self.total(user_index, computer_index)
+        return tuple(Fraction(count, total_games) for count in self.counts(user_index, computer_index))
+
+    def percentages(self, user_index, computer_index):
+        total_games = self.total(user_index, computer_index)
+        return tuple(count / total_games * 100 for count in self.counts(user_index, computer_index))
+
+    def match_probability(self, user_index, computer_index, total_rounds=3):
+        # Rounds are independent, so the user takes the match with a binomial majority of round wins.
+        # Like Result.display_final_result, every other match is awarded to the computer.
+        win, _, _ = self.exact(user_index, computer_index)
+        needed = total_rounds // 2 + 1
+        return sum(comb(total_rounds, wins) * win ** wins * (1 - win) ** (total_rounds - wins) for wins in range(needed, total_rounds + 1))
+
+    def match_percentage(self, user_index, computer_index, total_rounds=3):
+        # The same binomial as match_probability in floating point, which is all a rendered table needs.
+        win = int(self.wins[user_index][computer_index]) / self.total(user_index, computer_index)
+        needed = total_rounds // 2 + 1
+        return sum(comb(total_rounds, wins) * win ** wins * (1 - win) ** (total_rounds - wins) for wins in range(needed, total_rounds + 1)) * 100
+
 class ProbabilityTable:
-    def __init__(self, calculator):
+    def __init__(self, calculator, total_rounds=3, include_offsets=True, color=True):
         self.calculator = calculator
+        self.total_rounds = total_rounds
+        self.include_offsets = include_offsets
+        self.variant = "scores" if include_offsets else "faces"
+        self.palette = Palette(color)
+        # Every cell has the same width, the widest a percentage can be, so each row can be formatted and
+        # written on its own without first measuring the whole table.
+        self.cell_width = max(len("100.00% (Yours) / 100.00% (Mine)"), len(f"Best of {total_rounds}: 100.00% (Yours)"))
+
+    def compute_matrix(self, dice_sets):
+        if self.include_offsets:
+            return self.calculator.round_matrix(list(dice_sets.values()))
+        return self.calculator.win_matrix(list(dice_sets.values()))
+
+    def generate(self, dice_sets, matrix=None):
+        return "\n".join(self.iter_rows(dice_sets, matrix=matrix))
+
+    def iter_rows(self, dice_sets, rows=None, columns=None, matrix=None):
+        # Yields the header, then one block of text per row of user dice; rows and columns select a page.
+        # The outcome matrix is computed (or taken from the cache) first; only the formatting is done
+        # row by row, so the rendered table is never held in memory as a whole.
+        if matrix is None:
+            matrix = self.compute_matrix(dice_sets)
+        dice = list(dice_sets.values())
+        rows = range(matrix.size) if rows is None else rows
+        columns = range(matrix.size) if columns is None else columns
+        labels = {i: str(dice[i]) for i in rows}
+        label_width = max([len("User Dice")] + [len(label) for label in labels.values()])
+        cell_width, p = self.cell_width, self.palette
+
+        def line(label, cells):
+            return f"| {p.CYAN}{label:<{label_width}}{p.RESET} | " + " | ".join(f"{cell:<{cell_width}}" for cell in cells) + " |"
+
+        def border(fill):
+            return "+" + fill * (label_width + 2) + "+" + (fill * (cell_width + 2) + "+") * len(columns)
+
+        yield "\n".join([border("-"), line("User Dice", [f"{p.CYAN}{j + 1:<{cell_width}}{p.RESET}" for j in columns]), border("=")])
+        separator = border("-")
+        for i in rows:
+            outcomes, matches = [], []
+            for j in columns:
+                user_prob, computer_prob, draw_prob = matrix.percentages(i, j)
+                outcomes.append(f"{user_prob:.2f}% (Yours) / {computer_prob:.2f}% (Mine)" if i != j else f"Draw {draw_prob:.2f}%")
+                matches.append(f"Best of {self.total_rounds}: {matrix.match_percentage(i, j, self.total_rounds):.2f}% (Yours)")
+            yield "\n".join([line(labels[i], outcomes), line("", matches), separator])
+
+    def iter_counters(self, dice_sets, index, k=10, matrix=None):
+        # The k dice that most often beat die index in a round, best first, as if the computer had picked it.
+        if matrix is None:
+            matrix = self.compute_matrix(dice_sets)
+        dice = list(dice_sets.values())
+        counters = nlargest(k, (j for j in range(matrix.size) if j != index), key=lambda j: int(matrix.wins[j][index]) / matrix.total(j, index))
+        p = self.palette
+        yield f"{p.CYAN}Best {len(counters)} counters against die {index + 1}: {dice[index]}{p.RESET}"
+        number_width = len(str(matrix.size))
+        for rank, j in enumerate(counters, start=1):
+            user_prob, computer_prob, _ = matrix.percentages(j, index)
+            match_prob = matrix.match_percentage(j, index, self.total_rounds)
+            yield f"{rank:>{number_width}}. Die {j + 1:<{number_width}} {user_prob:6.2f}% (Yours) / {computer_prob:6.2f}% (Mine), Best of {self.total_rounds}: {match_prob:6.2f}% (Yours)  {dice[j]}"
+
+class ProbabilityCache:
+    def __init__(self, table, max_entries=32, cache_dir=None):
+        self.table = table
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(dice_sets, variant="faces"):
+        # Two dice with the same histogram are the same die, whatever order the faces were given in.
+        digest = hashlib.sha256(variant.encode())
+        for dice in dice_sets.values():
+            die = ProbabilityCalculator.as_die(dice)
+            digest.update(len(die.values).to_bytes(8, "little"))
+            digest.update(die.values.tobytes())
+            digest.update(die.bounds.tobytes())
+        return digest.hexdigest()
+
+    def get_matrix(self, dice_sets):
+        key = self.cache_key(dice_sets, self.table.variant)
+        with self.lock:
+            matrix = self.entries.get(key)
+            if matrix is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return matrix
+
+        matrix = self._load(key, len(dice_sets))
+        if matrix is not None:
+            with self.lock:
+                self.disk_hits += 1
+        else:
+            matrix = self.table.compute_matrix(dice_sets)
+            with self.lock:
+                self.misses += 1
+            self._store(key, matrix)
+
+        with self.lock:
+            self.entries[key] = matrix
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return matrix
 
     def generate(self, dice_sets):
-        headers = [f"{Fore.CYAN}User Dice{Style.RESET_ALL}"] + [f"{Fore.CYAN}{i}{Style.RESET_ALL}" for i in range(1, len(dice_sets) + 1)]
-        rows = []
-        for user_dice in dice_sets.values():
-            row = [f"{Fore.CYAN}{user_dice}{Style.RESET_ALL}"]
-            for computer_dice in dice_sets.values():
-                user_prob, computer_prob = self.calculator.calculate_probability(user_dice, computer_dice)
-                row.append(f"{user_prob:.2f}% (Yours) / {computer_prob:.2f}% (Mine)" if user_dice != computer_dice else f"Draw {user_prob:.2f}%")
-            rows.append(row)
-        return tabulate(rows, headers, tablefmt="grid")
+        return self.table.generate(dice_sets, self.get_matrix(dice_sets))
+
+    def iter_rows(self, dice_sets, rows=None, columns=None):
+        # A generator, so the matrix is only looked up once the first row is asked for.
+        yield from self.table.iter_rows(dice_sets, rows, columns, self.get_matrix(dice_sets))
+
+    def iter_counters(self, dice_sets, index, k=10):
+        yield from self.table.iter_counters(dice_sets, index, k, self.get_matrix(dice_sets))
+
+    def stats(self):
+        with self.lock:
+            return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses, "entries": len(self.entries)}
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _load(self, key, dice_count):
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._path(key)) as cache_file:
+                data = json.load(cache_file)
+            wins, losses, face_counts = data["wins"], data["losses"], data["face_counts"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        # An entry of the wrong shape would only fail later while rendering, so it is recomputed instead.
+        if not isinstance(face_counts, list) or len(face_counts) != dice_count:
+            return None
+        for counts in (wins, losses):
+            if not isinstance(counts, list) or len(counts) != dice_count or any(not isinstance(row, list) or len(row) != dice_count for row in counts):
+                return None
+        return OutcomeMatrix(wins, losses, face_counts)
+
+    def _store(self, key, matrix):
+        if self.cache_dir is None:
+            return
+        data = {
+            "wins": [[int(count) for count in row] for row in matrix.wins],
+            "losses": [[int(count) for count in row] for row in matrix.losses],
+            "face_counts": list(matrix.face_counts),
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write to a temporary file first so a concurrent launch never reads a partial entry.
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as cache_file:
+                json.dump(data, cache_file)
+            os.replace(tmp_path, self._path(key))
+        except OSError:
+            pass
+
+class GameExit(Exception):
+    pass
+
+class BufferedIO(ABC):
+    buffer_size = 1 << 16
+
+    def __init__(self):
+        # Lines are collected and written out together before the next prompt, or once enough has built up,
+        # rather than one by one. Subclasses only decide where a flushed batch goes.
+        self.pending = []
+        self.pending_size = 0
+
+    def write(self, text=""):
+        self.pending.append(text)
+        self.pending_size += len(text) + 1
+        if self.pending_size >= self.buffer_size:
+            self.flush()
+
+    def take_pending(self):
+        text = "\n".join(self.pending) + "\n" if self.pending else ""
+        self.pending = []
+        self.pending_size = 0
+        return text
+
+    @abstractmethod
+    def flush(self):
+        pass
+
+    async def drain(self):
+        self.flush()
+
+class ConsoleIO(BufferedIO):
+    def flush(self):
+        sys.stdout.write(self.take_pending())
+        sys.stdout.flush()
+
+    async def read(self, prompt):
+        self.flush()
+        try:
+            return input(prompt)
+        except EOFError:
+            raise GameExit("Exiting the game...")
+
+    async def run_blocking(self, func, *args):
+        return func(*args)
 
 class HelpHandler:
-    def __init__(self, table, message_handler):
+    def __init__(self, table, message_handler, io, page_size=10, top_k=10):
         self.table = table
         self.message_handler = message_handler
+        self.io = io
+        self.page_size = page_size
+        self.top_k = top_k
 
-    def show_probabilities(self, dice_sets):
-        print(self.message_handler.get_message("probability_help"))
-        print(self.table.generate(dice_sets))
+    async def stream(self, blocks):
+        # Each block is computed off the event loop and written out before the next one is started.
+        while True:
+            block = await self.io.run_blocking(next, blocks, None)
+            if block is None:
+                return
+            self.io.write(block)
+            await self.io.drain()
+
+    async def show_probabilities(self, dice_sets):
+        self.io.write(self.message_handler.get_message("probability_help"))
+        dice_count = len(dice_sets)
+        if dice_count <= self.page_size:
+            await self.stream(self.table.iter_rows(dice_sets))
+            return
+
+        # Larger tables are shown a page of page_size x page_size cells at a time.
+        p = self.message_handler.palette
+        blocks = -(-dice_count // self.page_size)
+        pages = blocks * blocks
+        page = 0
+        while True:
+            row_block, column_block = divmod(page, blocks)
+            rows = range(row_block * self.page_size, min((row_block + 1) * self.page_size, dice_count))
+            columns = range(column_block * self.page_size, min((column_block + 1) * self.page_size, dice_count))
+            self.io.write(f"{p.CYAN}Page {page + 1}/{pages}: your dice {rows.start + 1}-{rows.stop} against my dice {columns.start + 1}-{columns.stop}{p.RESET}")
+            await self.stream(self.table.iter_rows(dice_sets, rows, columns))
 
+            while True:
+                command = (await self.io.read(f"{p.MAGENTA}Page (1-{pages}, N, P, Enter to go back, X): {p.RESET}")).strip().lower()
+                if command == '':
+                    return
+                if command == 'x':
+                    raise GameExit("Exiting the game...")
+                if command == 'n' and page + 1 < pages:
+                    page += 1
+                    break
+                if command == 'p' and page > 0:
+                    page -= 1
+                    break
+                if command.isdigit() and 1 <= int(command) <= pages:
+                    page = int(command) - 1
+                    break
+                self.io.write(f"{p.RED}Invalid input, please try again.{p.RESET}")
+
+    async def show_counters(self, dice_sets, index):
+        await self.stream(self.table.iter_counters(dice_sets, index, self.top_k))
+
+
+class Die:
+    __slots__ = ("faces", "values", "bounds")
+    summary_faces = 20
+
+    def __init__(self, faces):
+        try:
+            self.faces = faces if isinstance(faces, array) and faces.typecode == "i" else array("i", faces)
+        except OverflowError:
+            raise ValueError("Face values must fit in a 32-bit integer.")
+        # values holds the sorted distinct faces; bounds[t] is how many faces are below values[t].
+        # Values are 64-bit so score dice (a face plus its 0-5 offset) fit even for the largest 32-bit faces.
+        if np is not None:
+            distinct, counts = np.unique(np.frombuffer(self.faces, dtype=np.int32), return_counts=True)
+            self.values = array("q", distinct.astype(np.int64).tobytes())
+            self.bounds = array("q", np.concatenate(([0], np.cumsum(counts))).astype(np.int64).tobytes())
+        else:
+            histogram = Counter(self.faces)
+            self.values = array("q", sorted(histogram))
+            self.bounds = array("q", [0])
+            for value in self.values:
+                self.bounds.append(self.bounds[-1] + histogram[value])
+
+    @classmethod
+    def from_histogram(cls, values, counts):
+        # Dice built from a histogram (such as score distributions) never materialise their faces.
+        die = cls.__new__(cls)
+        die.faces = None
+        if np is not None:
+            die.values = array("q", np.asarray(values, dtype=np.int64).tobytes())
+            die.bounds = array("q", np.concatenate(([0], np.cumsum(counts))).astype(np.int64).tobytes())
+            return die
+        die.values = array("q", values)
+        die.bounds = array("q", [0])
+        for count in counts:
+            die.bounds.append(die.bounds[-1] + count)
+        return die
+
+    def __len__(self):
+        return self.bounds[-1]
+
+    def __iter__(self):
+        if self.faces is not None:
+            return iter(self.faces)
+        return (value for t, value in enumerate(self.values) for _ in range(self.bounds[t + 1] - self.bounds[t]))
+
+    def sample(self):
+        # Picking a face index uniformly and mapping it through the histogram takes O(log k).
+        face_index = random.randrange(len(self))
+        return self.values[bisect_right(self.bounds, face_index) - 1]
+
+    def __str__(self):
+        if len(self) <= self.summary_faces:
+            return str(list(self))
+        shown = ", ".join(str(face) for face in islice(self, self.summary_faces // 2))
+        return f"[{shown}, ...] ({len(self)} faces, {len(self.values)} distinct from {self.values[0]} to {self.values[-1]})"
+
+    def __repr__(self):
+        return f"Die({self})"
 
 class DiceSet:
     def __init__(self, dice_sets):
-        self.dice_sets = {i: dice for i, dice in enumerate(dice_sets)}
+        self.dice_sets = {i: dice if isinstance(dice, Die) else Die(dice) for i, dice in enumerate(dice_sets)}
         self.dice_count = len(dice_sets)
         self.faces_count = len(dice_sets[0])
 
@@ -149,178 +699,279 @@ class DiceSet:
         return self.dice_sets.get(index, [])
     
 class PlayerTurn:
-    def __init__(self, dice_manager, message_handler, help_handler, hmac_key, player_type):
+    def __init__(self, dice_manager, message_handler, help_handler, commitments, player_type, io, strategy=None):
         self.dice_manager = dice_manager
         self.message_handler = message_handler
         self.help_handler = help_handler
-        self.random_generator = RandomGenerator()
-        self.hmac_key = hmac_key
+        self.commitments = commitments
         self.player_type = player_type
+        self.io = io
+        self.strategy = strategy
+        self.last_choice = None
 
-    def choose_dice(self, available_dice):
+    async def choose_dice(self, available_dice, opponent_choice=None):
+        p = self.message_handler.palette
         if self.player_type == "user":
-            print(f"{Fore.GREEN}Choose your dice...{Style.RESET_ALL}")
+            self.io.write(f"{p.GREEN}Choose your dice...{p.RESET}")
             for i, dice in enumerate(available_dice.values()):
-                print(f"🎲 ({i+1}): {str(dice)}")
-            print("(W): Winning probability table\n(X): Exit")
+                self.io.write(f"🎲 ({i+1}): {str(dice)}")
+            self.io.write(f"(W): Winning probability table\n(T <die>): Best {self.help_handler.top_k} counters against a die\n(X): Exit")
 
             while True:
-                choice = input(f"{Fore.MAGENTA}Select dice (1-{len(available_dice)}, W, X): {Style.RESET_ALL}").strip().lower()
+                choice = (await self.io.read(f"{p.MAGENTA}Select dice (1-{len(available_dice)}, W, T <die>, X): {p.RESET}")).strip().lower()
 
                 if choice == 'x': 
-                    sys.exit("Exiting the game...")
+                    raise GameExit("Exiting the game...")
                 if choice == 'w': 
-                    self.help_handler.show_probabilities(self.dice_manager.dice_sets)
+                    await self.help_handler.show_probabilities(self.dice_manager.dice_sets)
+                    continue
+                if choice.startswith('t') and choice[1:].strip().isdigit() and 1 <= int(choice[1:]) <= self.dice_manager.dice_count:
+                    await self.help_handler.show_counters(self.dice_manager.dice_sets, int(choice[1:]) - 1)
                     continue
                 if choice.isdigit() and 1 <= int(choice) <= len(available_dice):
-                    chosen_dice = available_dice[list(available_dice.keys())[int(choice) - 1]]
-                    print(f"Chosen dice: {chosen_dice}") 
+                    self.last_choice = int(choice) - 1
+                    chosen_dice = available_dice[list(available_dice.keys())[self.last_choice]]
+                    self.io.write(f"Chosen dice: {chosen_dice}") 
                     return chosen_dice
 
-                print(f"{Fore.RED}Invalid input, please try again.{Style.RESET_ALL}")
+                self.io.write(f"{p.RED}Invalid input, please try again.{p.RESET}")
 
-        print(f"{Fore.YELLOW}I am choosing dice...{Style.RESET_ALL}")
-        chosen_dice = secrets.choice(list(available_dice.values()))
-        print(f"Chosen dice: {chosen_dice}") 
+        self.io.write(f"{p.YELLOW}I am choosing dice...{p.RESET}")
+        if self.strategy is not None:
+            self.last_choice = self.strategy.choose(opponent_choice)
+        else:
+            self.last_choice = secrets.randbelow(len(available_dice))
+        chosen_dice = available_dice[list(available_dice.keys())[self.last_choice]]
+        self.io.write(f"Chosen dice: {chosen_dice}") 
         return chosen_dice
 
 
-    def roll_and_calculate_mod6(self, available_dice):
-        chosen_dice = self.choose_dice(available_dice)
-        face_obtained = random.choice((chosen_dice)) 
+    async def roll_and_calculate_mod6(self, available_dice, opponent_choice=None):
+        chosen_dice = await self.choose_dice(available_dice, opponent_choice)
+        face_obtained = chosen_dice.sample()
+        p = self.message_handler.palette
 
-        random_value = self.random_generator.generate_random(6)
+        random_value, commitment = self.commitments.draw(6)
         mod6_value = random_value % 6
-        hmac_value = self.random_generator.generate_hmac(self.hmac_key, random_value)
 
         if self.player_type == "user":
-            print(f"We obtain a number mod 6 between 0-5 for you: {mod6_value} (HMAC: {hmac_value})")
+            self.io.write(f"We obtain a number mod 6 between 0-5 for you: {mod6_value} ({commitment})")
             result = [face_obtained + mod6_value]
-            print(f"{Fore.YELLOW}Your dice: {face_obtained} Your mod6: {mod6_value}{Style.RESET_ALL}")
-            print(f"{Fore.BLUE}This is your result: {result}{Style.RESET_ALL}")
+            self.io.write(f"{p.YELLOW}Your dice: {face_obtained} Your mod6: {mod6_value}{p.RESET}")
+            self.io.write(f"{p.BLUE}This is your result: {result}{p.RESET}")
         else:
-            print(f"We obtain a number mod 6 between 0-5 for me: {mod6_value} (HMAC={hmac_value})")
+            self.io.write(f"We obtain a number mod 6 between 0-5 for me: {mod6_value} ({commitment})")
             result = [face_obtained + mod6_value]
-            print(f"{Fore.YELLOW}My dice: {face_obtained} My Mod6: {mod6_value}{Style.RESET_ALL}")
-            print(f"{Fore.BLUE}This is my result: {result}{Style.RESET_ALL}")
+            self.io.write(f"{p.YELLOW}My dice: {face_obtained} My Mod6: {mod6_value}{p.RESET}")
+            self.io.write(f"{p.BLUE}This is my result: {result}{p.RESET}")
         
         return result
 
 class DiceGame:
-    def __init__(self, dice_sets):
-        self.message_handler = MessageHandler()
+    def __init__(self, dice_sets, cache_dir=None, io=None, probability_cache=None, transcript=None, computer_strategy=None, color=True, page_size=10, top_k=10):
+        self.io = io or ConsoleIO()
+        self.message_handler = MessageHandler(Palette(color))
         self.random_generator = RandomGenerator()
-        self.hmac_key = self.random_generator.generate_hmac_key()
+        if transcript is not None:
+            self.commitments = MerkleCommitments(self.random_generator, transcript)
+        else:
+            self.commitments = HmacCommitments(self.random_generator)
         self.dice_manager = DiceSet(dice_sets)
         self.probability_calculator = ProbabilityCalculator()
-        self.probability_table = ProbabilityTable(self.probability_calculator)
-        self.help_handler = HelpHandler(self.probability_table, self.message_handler)
-        self.user_turn = PlayerTurn(self.dice_manager, self.message_handler, self.help_handler, self.hmac_key, "user")
-        self.computer_turn = PlayerTurn(self.dice_manager, self.message_handler, self.help_handler, self.hmac_key, "computer")
-        self.result_handler = Result(self.message_handler)
         self.total_rounds = 3
         self.total_choices = 4
-
-    def start(self):
+        self.probability_table = ProbabilityTable(self.probability_calculator, self.total_rounds, color=color)
+        self.probability_cache = probability_cache or ProbabilityCache(self.probability_table, cache_dir=cache_dir)
+        self.help_handler = HelpHandler(self.probability_cache, self.message_handler, self.io, page_size, top_k)
+        self.user_turn = PlayerTurn(self.dice_manager, self.message_handler, self.help_handler, self.commitments, "user", self.io)
+        self.computer_turn = PlayerTurn(self.dice_manager, self.message_handler, self.help_handler, self.commitments, "computer", self.io, computer_strategy)
+        self.result_handler = Result(self.message_handler, self.io)
+
+    @classmethod
+    def from_library(cls, library_path, selection, **kwargs):
+        with DiceLibrary(library_path) as library:
+            return cls(library.select(selection), **kwargs)
+
+    async def start(self):
         available_dice = self.dice_manager.dice_sets.copy()
         dice_count = self.dice_manager.dice_count
         faces_count = self.dice_manager.faces_count
         self.show_welcome(dice_count, faces_count)
-        self.play_turn(available_dice)
+        try:
+            while True:
+                await self.play_turn(available_dice)
+                if not await self.replay_or_exit():
+                    break
+        finally:
+            # A match left early (X, end of input, a dropped client) is still closed in the transcript.
+            self.commitments.end_match()
+            self.io.flush()
 
     def show_welcome(self, dice_count, faces_count):
-        print(self.message_handler.get_message("welcome", dice_count=dice_count, faces_count=faces_count))
+        self.io.write(self.message_handler.get_message("welcome", dice_count=dice_count, faces_count=faces_count))
 
-    def decide_first_move(self):
-        print(self.message_handler.get_message("first_move"))
-        computer_choice = self.random_generator.generate_random(self.total_choices)
-        hmac_result = self.random_generator.generate_hmac(self.hmac_key, computer_choice)
-        print(f"I have selected a secret value for this round. (HMAC={hmac_result})")
+    async def decide_first_move(self):
+        p = self.message_handler.palette
+        self.io.write(self.message_handler.get_message("first_move"))
+        computer_choice, commitment = self.commitments.draw(self.total_choices)
+        self.io.write(f"I have selected a secret value for this round. ({commitment})")
 
         while True:
-            guess = input(f"{Fore.MAGENTA}Your guess: {Style.RESET_ALL}").strip().lower()
+            guess = (await self.io.read(f"{p.MAGENTA}Your guess: {p.RESET}")).strip().lower()
             if guess == 'x':
-                sys.exit("Thanks for playing! 👋")
+                raise GameExit("Thanks for playing! 👋")
             if guess.isdigit():
                 guess_num = int(guess)
                 if 0 <= guess_num <= 3:
+                    self.commitments.note_guess(guess_num)
                     if guess_num == computer_choice:
-                        print(f"{Fore.GREEN}You will make the first move!{Style.RESET_ALL}")
+                        self.io.write(f"{p.GREEN}You will make the first move!{p.RESET}")
                         return "user"
                     else:
-                        print(f"{Fore.RED}I will make the first move!{Style.RESET_ALL}")
+                        self.io.write(f"{p.RED}I will make the first move!{p.RESET}")
                         return "computer"
                 else:
-                    print("Invalid choice. Please select a number between 0 and 3.")
+                    self.io.write("Invalid choice. Please select a number between 0 and 3.")
             else:
-                print("Invalid input, try again.")
+                self.io.write("Invalid input, try again.")
 
     
-    def play_turn(self, available_dice):
+    async def play_turn(self, available_dice):
+        announcement = self.commitments.begin_match(self.total_rounds, self.total_choices)
+        if announcement:
+            self.io.write(announcement)
+
+        p = self.message_handler.palette
         for round_number in range(self.total_rounds):
-            print(f"\n{Fore.YELLOW}--- Round {round_number + 1} ---{Style.RESET_ALL}")
+            self.io.write(f"\n{p.YELLOW}--- Round {round_number + 1} ---{p.RESET}")
 
-            first_player = self.decide_first_move()
+            first_player = await self.decide_first_move()
 
             if first_player == "user":
-                user_roll = self.user_turn.roll_and_calculate_mod6(available_dice)
-                computer_roll = self.computer_turn.roll_and_calculate_mod6(available_dice)
+                user_roll = await self.user_turn.roll_and_calculate_mod6(available_dice)
+                computer_roll = await self.computer_turn.roll_and_calculate_mod6(available_dice, self.user_turn.last_choice)
             else:
-                computer_roll = self.computer_turn.roll_and_calculate_mod6(available_dice)
-                user_roll = self.user_turn.roll_and_calculate_mod6(available_dice)
+                computer_roll = await self.computer_turn.roll_and_calculate_mod6(available_dice)
+                user_roll = await self.user_turn.roll_and_calculate_mod6(available_dice)
 
             self.result_handler.evaluate(user_roll, computer_roll)
+            self.commitments.record_round(first_player == "user", user_roll[0], computer_roll[0])
 
-        self.result_handler.display_final_result(self.total_rounds, self.hmac_key)
-        self.replay_or_exit()
+        self.result_handler.display_final_result(self.total_rounds, self.commitments)
+        self.commitments.end_match()
 
-    def replay_or_exit(self):
-        replay = input(self.message_handler.get_message("replay")).strip().lower()
+    async def replay_or_exit(self):
+        replay = (await self.io.read(self.message_handler.get_message("replay"))).strip().lower()
         if replay == 'y':
-            self.user_wins = 0
-            self.computer_wins = 0
-            available_dice = self.dice_manager.dice_sets
-            self.play_turn(available_dice)
-        else:
-            print("Thanks for playing! 👋")
-            sys.exit()
+            self.result_handler.reset()
+            return True
+        self.io.write("Thanks for playing! 👋")
+        return False
 
 class Result:
-    def __init__(self, message_handler):
+    def __init__(self, message_handler, io):
         self.message_handler = message_handler
+        self.io = io
+        self.reset()
+
+    def reset(self):
         self.user_wins = 0
         self.computer_wins = 0
 
     def evaluate(self, user_roll, computer_roll):
-        print(f"Your roll: {user_roll}")
-        print(f"My roll: {computer_roll}")
+        self.io.write(f"Your roll: {user_roll}")
+        self.io.write(f"My roll: {computer_roll}")
 
         if user_roll > computer_roll:
-            print(self.message_handler.get_message("win"))
+            self.io.write(self.message_handler.get_message("win"))
             self.user_wins += 1
         elif user_roll < computer_roll:
-            print(self.message_handler.get_message("lose"))
+            self.io.write(self.message_handler.get_message("lose"))
             self.computer_wins += 1
         else:
-            print(self.message_handler.get_message("draw"))
+            self.io.write(self.message_handler.get_message("draw"))
 
-    def display_final_result(self, total_rounds, hmac_key):
+    def display_final_result(self, total_rounds, commitments):
         if self.user_wins >= 2:
-            print(self.message_handler.get_message("final_result_win", user_wins=self.user_wins, total_rounds=total_rounds))
+            self.io.write(self.message_handler.get_message("final_result_win", user_wins=self.user_wins, total_rounds=total_rounds))
         else:
-            print(self.message_handler.get_message("final_result_lose", total_rounds=total_rounds))
-        print(self.message_handler.get_message("reveal_hmac", hmac_key=hmac_key.hex()))
+            self.io.write(self.message_handler.get_message("final_result_lose", total_rounds=total_rounds))
+        self.io.write(commitments.reveal(self.message_handler))
 
 
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description='Play the General Non-Transitive Dice Game')
-    parser.add_argument('dice_sets', nargs='+', help='List of dice sets (e.g., "3,4,7,7,4 7,4,5,6,3,5 8,5,8,2,3,8")')
+    parser.add_argument('dice_sets', nargs='*', help='List of dice sets (e.g., "3,4,7,7,4 7,4,5,6,3,5 8,5,8,2,3,8")')
+    parser.add_argument('--library', help='Binary dice library to play with instead of dice on the command line')
+    parser.add_argument('--select', help='Comma-separated die numbers to use from the library (defaults to all)')
+    parser.add_argument('--cache-dir', help='Directory for cached probability tables, reused across launches')
+    parser.add_argument('--simulate', type=int, metavar='MATCHES', help='Play MATCHES headless best-of-3 matches and report win rates')
+    parser.add_argument('--user-strategy', default='uniform', help='Simulated user strategy: uniform, counter, optimal or fixed:<die number>')
+    parser.add_argument('--computer-strategy', default='uniform', help='Computer strategy: uniform or optimal, and for simulations also counter or fixed:<die number>')
+    parser.add_argument('--seed', type=int, help='Random seed for the simulation')
+    parser.add_argument('--transcript', help='Commit to each match with a Merkle root and log every round to this binary transcript')
+    parser.add_argument('--plain', action='store_true', help='Plain output without colors')
+    parser.add_argument('--page-size', type=int, default=10, help='Dice per page when the probability table is too large to show at once')
+    parser.add_argument('--top', type=int, default=10, help='Number of counters listed by the T <die> command and --counters')
+    parser.add_argument('--table', action='store_true', help='Stream the whole probability table and exit')
+    parser.add_argument('--counters', type=int, metavar='DIE', help='List the best counters against this die number and exit')
     args = parser.parse_args()
 
-    validations = GameValidations()
-    dice_sets = validations.validate_dice_input((args.dice_sets))
+    if not args.plain:
+        init(autoreset=True)
+    if args.page_size < 1 or args.top < 1:
+        print("Error: --page-size and --top must be at least 1.")
+        sys.exit(1)
 
-    game = DiceGame(dice_sets)
-    game.start()
+    validations = GameValidations()
+    if args.library:
+        dice_sets = validations.validate_library_selection(args.library, args.select)
+    else:
+        dice_sets = validations.validate_dice_input((args.dice_sets))
+
+    if args.simulate is not None:
+        if args.simulate < 1:
+            print("Error: the number of simulated matches must be at least 1.")
+            sys.exit(1)
+        try:
+            from simulation import MatchSimulator
+            simulator = MatchSimulator(dice_sets, args.user_strategy, args.computer_strategy, seed=args.seed)
+        except ImportError:
+            print("Error: the simulation mode requires NumPy.")
+            sys.exit(1)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        print(simulator.run(args.simulate))
+        sys.exit()
+
+    if args.table or args.counters is not None:
+        table = ProbabilityTable(ProbabilityCalculator(), color=not args.plain)
+        dice_manager = DiceSet(dice_sets)
+        if args.counters is not None and not 1 <= args.counters <= dice_manager.dice_count:
+            print(f"Error: the die number must be between 1 and {dice_manager.dice_count}.")
+            sys.exit(1)
+        if args.table:
+            blocks = table.iter_rows(dice_manager.dice_sets)
+        else:
+            blocks = table.iter_counters(dice_manager.dice_sets, args.counters - 1, args.top)
+        for block in blocks:
+            print(block)
+        sys.exit()
+
+    computer_strategy = None
+    if args.computer_strategy == 'optimal':
+        from strategy import StrategyEngine
+        computer_strategy = StrategyEngine(dice_sets)
+    elif args.computer_strategy != 'uniform':
+        print("Error: the computer strategy must be 'uniform' or 'optimal' outside simulations.")
+        sys.exit(1)
+
+    transcript = TranscriptWriter(args.transcript) if args.transcript else None
+    game = DiceGame(dice_sets, cache_dir=args.cache_dir, transcript=transcript, computer_strategy=computer_strategy, color=not args.plain, page_size=args.page_size, top_k=args.top)
+    try:
+        asyncio.run(game.start())
+    except GameExit as e:
+        sys.exit(str(e))
 
@@ -0,0 +1,126 @@
+import argparse
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from commitments import TranscriptWriter
+from game_dice import BufferedIO, DiceGame, DiceSet, GameExit, GameValidations, ProbabilityCache, ProbabilityCalculator, ProbabilityTable
+
+# Every line the server sends is plain output, except prompts, which start with this marker
+# and expect exactly one reply line from the client.
+PROMPT_MARKER = "> "
+
+
+class StreamIO(BufferedIO):
+    def __init__(self, reader, writer, executor):
+        super().__init__()
+        self.reader = reader
+        self.writer = writer
+        self.executor = executor
+
+    def flush(self):
+        text = self.take_pending()
+        if text:
+            self.writer.write(text.encode())
+
+    async def drain(self):
+        self.flush()
+        await self.writer.drain()
+
+    async def read(self, prompt):
+        self.write(f"{PROMPT_MARKER}{prompt}")
+        await self.drain()
+        try:
+            line = await self.reader.readline()
+        except ValueError:
+            # readline raises ValueError when a line is longer than the stream limit.
+            raise GameExit("Input line too long")
+        if not line:
+            raise GameExit("Client disconnected")
+        return line.decode(errors="replace")
+
+    async def run_blocking(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+
+class GameServer:
+    def __init__(self, dice_sets, max_sessions=10000, workers=None, cache_dir=None, transcript=None, color=True):
+        # The dice are built once here; every session reuses the same Die objects instead of rebuilding them.
+        self.dice = list(DiceSet(dice_sets).dice_sets.values())
+        self.transcript = transcript
+        self.color = color
+        self.sessions = asyncio.Semaphore(max_sessions)
+        self.executor = ThreadPoolExecutor(workers)
+        # The dice are the same for every session, so all sessions share one probability cache.
+        self.probability_cache = ProbabilityCache(ProbabilityTable(ProbabilityCalculator(), color=color), cache_dir=cache_dir)
+        self.active_sessions = 0
+        self.completed_sessions = 0
+
+    async def handle_session(self, reader, writer):
+        async with self.sessions:
+            self.active_sessions += 1
+            io = StreamIO(reader, writer, self.executor)
+            # Each session gets its own DiceGame, and with it its own HMAC key and Result state.
+            game = DiceGame(self.dice, io=io, probability_cache=self.probability_cache, transcript=self.transcript, color=self.color)
+            try:
+                await game.start()
+            except GameExit as e:
+                io.write(str(e))
+            except ConnectionError:
+                pass
+            finally:
+                self.active_sessions -= 1
+                self.completed_sessions += 1
+                try:
+                    await io.drain()
+                    writer.close()
+                    await writer.wait_closed()
+                except ConnectionError:
+                    pass
+
+    def stats_line(self):
+        cache = self.probability_cache.stats()
+        return (f"Sessions: {self.active_sessions} active, {self.completed_sessions} completed. "
+                f"Probability cache: {cache['hits']} hits, {cache['disk_hits']} disk hits, {cache['misses']} misses, {cache['entries']} entries.")
+
+    async def log_stats(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            print(self.stats_line(), flush=True)
+
+    async def serve(self, host, port, stats_interval=60):
+        server = await asyncio.start_server(self.handle_session, host, port, limit=1 << 20)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"Serving dice game sessions on {addresses}", flush=True)
+        stats = asyncio.create_task(self.log_stats(stats_interval)) if stats_interval > 0 else None
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if stats is not None:
+                stats.cancel()
+            print(self.stats_line(), flush=True)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Host many concurrent dice game sessions over TCP')
+    parser.add_argument('dice_sets', nargs='+', help='List of dice sets (e.g., "3,4,7,7,4 7,4,5,6,3,5 8,5,8,2,3,8")')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on')
+    parser.add_argument('--max-sessions', type=int, default=10000, help='Maximum number of concurrent sessions')
+    parser.add_argument('--workers', type=int, help='Threads used for probability tables')
+    parser.add_argument('--cache-dir', help='Directory for cached probability tables, reused across launches')
+    parser.add_argument('--transcript', help='Commit to each match with a Merkle root and log every round to this binary transcript')
+    parser.add_argument('--plain', action='store_true', help='Send plain output without colors')
+    parser.add_argument('--stats-interval', type=float, default=60, help='Seconds between session and cache statistics lines (0 disables them)')
+    args = parser.parse_args()
+
+    validations = GameValidations()
+    dice_sets = validations.validate_dice_input((args.dice_sets))
+
+    transcript = TranscriptWriter(args.transcript) if args.transcript else None
+    server = GameServer(dice_sets, max_sessions=args.max_sessions, workers=args.workers, cache_dir=args.cache_dir, transcript=transcript, color=not args.plain)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.stats_interval))
+    except KeyboardInterrupt:
+        sys.exit()
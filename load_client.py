@@ -0,0 +1,98 @@
+import argparse
+import asyncio
+import random
+import re
+import time
+from game_server import PROMPT_MARKER
+
+ANSI_CODE = re.compile(r"\x1b\[[0-9;]*m")
+DICE_RANGE = re.compile(r"\(1-(\d+),")
+
+
+class LoadClient:
+    def __init__(self, host, port, matches_per_session=1, help_rate=0.0):
+        self.host = host
+        self.port = port
+        self.matches_per_session = matches_per_session
+        self.help_rate = help_rate
+        self.turn_latencies = []
+        self.completed_sessions = 0
+        self.failed_sessions = 0
+
+    def reply(self, prompt, state):
+        if "guess" in prompt:
+            return str(random.randrange(4))
+        if "Select dice" in prompt:
+            if random.random() < self.help_rate:
+                return "w"
+            return str(random.randint(1, int(DICE_RANGE.search(prompt).group(1))))
+        if "Page" in prompt:
+            return ""
+        if "play again" in prompt:
+            state["matches"] += 1
+            return "y" if state["matches"] < self.matches_per_session else "n"
+        return "x"
+
+    async def play_session(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port, limit=1 << 20)
+        state = {"matches": 0}
+        sent_at = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                text = ANSI_CODE.sub("", line.decode(errors="replace"))
+                if not text.startswith(PROMPT_MARKER):
+                    continue
+                if sent_at is not None:
+                    self.turn_latencies.append(time.perf_counter() - sent_at)
+                writer.write(f"{self.reply(text, state)}\n".encode())
+                await writer.drain()
+                sent_at = time.perf_counter()
+            self.completed_sessions += 1
+        except ConnectionError:
+            self.failed_sessions += 1
+        finally:
+            writer.close()
+
+    async def run(self, sessions, concurrency):
+        limit = asyncio.Semaphore(concurrency)
+
+        async def limited_session():
+            async with limit:
+                try:
+                    await self.play_session()
+                except OSError:
+                    self.failed_sessions += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(limited_session() for _ in range(sessions)))
+        return time.perf_counter() - started
+
+    def report(self, elapsed):
+        latencies = sorted(self.turn_latencies)
+        lines = [
+            f"Sessions completed: {self.completed_sessions} (failed: {self.failed_sessions})",
+            f"Sessions per second: {self.completed_sessions / elapsed:.1f}",
+        ]
+        if latencies:
+            for label, quantile in (("p50", 0.50), ("p99", 0.99)):
+                lines.append(f"Turn latency {label}: {latencies[min(len(latencies) - 1, int(quantile * len(latencies)))] * 1000:.2f} ms")
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Generate load against a running dice game server')
+    parser.add_argument('--host', default='127.0.0.1', help='Server address')
+    parser.add_argument('--port', type=int, default=8765, help='Server port')
+    parser.add_argument('--sessions', type=int, default=1000, help='Total number of sessions to play')
+    parser.add_argument('--concurrency', type=int, default=200, help='Sessions open at the same time')
+    parser.add_argument('--matches', type=int, default=1, help='Matches played per session')
+    parser.add_argument('--help-rate', type=float, default=0.0, help='Chance of asking for the probability table before choosing a die')
+    args = parser.parse_args()
+
+    client = LoadClient(args.host, args.port, matches_per_session=args.matches, help_rate=args.help_rate)
+    elapsed = asyncio.run(client.run(args.sessions, args.concurrency))
+    print(client.report(elapsed))
@@ -0,0 +1,166 @@
+import math
+import numpy as np
+from game_dice import DiceSet, ProbabilityCalculator
+
+
+class UniformStrategy:
+    def __init__(self, dice_count):
+        self.dice_count = dice_count
+
+    def choose(self, rng, shape):
+        return rng.integers(0, self.dice_count, size=shape)
+
+    def respond(self, rng, opponent_choices):
+        return self.choose(rng, opponent_choices.shape)
+
+
+class FixedStrategy:
+    def __init__(self, dice_index):
+        self.dice_index = dice_index
+
+    def choose(self, rng, shape):
+        return np.full(shape, self.dice_index, dtype=np.int64)
+
+    def respond(self, rng, opponent_choices):
+        return self.choose(rng, opponent_choices.shape)
+
+
+class CounterStrategy(UniformStrategy):
+    def __init__(self, dice_count, win_matrix):
+        super().__init__(dice_count)
+        # counters[j] is the die with the best chance of beating die j.
+        wins = np.asarray(win_matrix.wins, dtype=np.float64)
+        totals = np.outer(win_matrix.face_counts, win_matrix.face_counts)
+        self.counters = np.argmax(wins / totals, axis=0)
+
+    def respond(self, rng, opponent_choices):
+        return self.counters[opponent_choices]
+
+
+class OptimalStrategy:
+    def __init__(self, engine):
+        self.equilibrium = np.asarray(engine.equilibrium, dtype=np.float64)
+        self.equilibrium /= self.equilibrium.sum()
+        self.best_response = np.asarray(engine.best_response, dtype=np.int64)
+
+    def choose(self, rng, shape):
+        return rng.choice(len(self.equilibrium), size=shape, p=self.equilibrium)
+
+    def respond(self, rng, opponent_choices):
+        return self.best_response[opponent_choices]
+
+
+STRATEGIES = ("uniform", "counter", "optimal", "fixed:<die number>")
+
+
+def build_strategy(spec, dice_manager, player="user"):
+    name, _, argument = spec.partition(":")
+    if name == "uniform":
+        return UniformStrategy(dice_manager.dice_count)
+    if name == "counter":
+        win_matrix = ProbabilityCalculator.round_matrix(list(dice_manager.dice_sets.values()))
+        return CounterStrategy(dice_manager.dice_count, win_matrix)
+    if name == "optimal":
+        from strategy import StrategyEngine
+        return OptimalStrategy(StrategyEngine(list(dice_manager.dice_sets.values()), player=player))
+    if name == "fixed" and argument.isdigit() and 1 <= int(argument) <= dice_manager.dice_count:
+        return FixedStrategy(int(argument) - 1)
+    raise ValueError(f"Unknown strategy '{spec}'. Available strategies: {', '.join(STRATEGIES)}")
+
+
+def wilson_interval(successes, trials, z=1.96):
+    if trials == 0:
+        # With nothing observed, any rate is possible.
+        return 0.0, 1.0
+    ratio = successes / trials
+    denominator = 1 + z * z / trials
+    center = (ratio + z * z / (2 * trials)) / denominator
+    margin = z * math.sqrt(ratio * (1 - ratio) / trials + z * z / (4 * trials * trials)) / denominator
+    return center - margin, center + margin
+
+
+class SimulationReport:
+    def __init__(self, matches, user_matches, round_counts):
+        self.matches = matches
+        self.user_matches = user_matches
+        self.round_counts = round_counts
+
+    def user_win_rate(self):
+        return self.user_matches / self.matches if self.matches else 0.0
+
+    def confidence_interval(self):
+        return wilson_interval(self.user_matches, self.matches)
+
+    def __str__(self):
+        low, high = self.confidence_interval()
+        total_rounds = sum(self.round_counts.values())
+        computer_win_rate = 1 - self.user_win_rate() if self.matches else 0.0
+        lines = [
+            f"Matches played: {self.matches}",
+            f"User match win rate: {self.user_win_rate() * 100:.3f}% (95% CI {low * 100:.3f}% - {high * 100:.3f}%)",
+            f"Computer match win rate: {computer_win_rate * 100:.3f}% (95% CI {(1 - high) * 100:.3f}% - {(1 - low) * 100:.3f}%)",
+        ]
+        for outcome, count in self.round_counts.items():
+            low, high = wilson_interval(count, total_rounds)
+            rate = count / total_rounds if total_rounds else 0.0
+            lines.append(f"Round {outcome} rate: {rate * 100:.3f}% (95% CI {low * 100:.3f}% - {high * 100:.3f}%)")
+        return "\n".join(lines)
+
+
+class MatchSimulator:
+    def __init__(self, dice_sets, user_strategy="uniform", computer_strategy="uniform", total_rounds=3, total_choices=4, seed=None):
+        self.dice_manager = DiceSet(dice_sets)
+        self.user_strategy = build_strategy(user_strategy, self.dice_manager, "user")
+        self.computer_strategy = build_strategy(computer_strategy, self.dice_manager, "computer")
+        self.total_rounds = total_rounds
+        self.total_choices = total_choices
+        self.rng = np.random.default_rng(seed)
+
+        # All dice share one concatenated histogram; a face is drawn by offsetting a uniform face
+        # index into its die's range and looking it up in the global cumulative counts.
+        dice = list(self.dice_manager.dice_sets.values())
+        self.face_counts = np.array([len(die) for die in dice], dtype=np.int64)
+        self.face_offsets = np.concatenate(([0], np.cumsum(self.face_counts)[:-1]))
+        self.values = np.concatenate([np.frombuffer(die.values, dtype=np.int64) for die in dice])
+        self.cumulative = np.concatenate([np.frombuffer(die.bounds, dtype=np.int64)[1:] + offset for die, offset in zip(dice, self.face_offsets)])
+
+    def roll(self, dice_indices):
+        face_indices = self.rng.integers(0, self.face_counts[dice_indices]) + self.face_offsets[dice_indices]
+        faces = self.values[np.searchsorted(self.cumulative, face_indices, side="right")]
+        # Same draw as PlayerTurn.roll_and_calculate_mod6: a uniform face plus a 0-5 offset.
+        return faces + self.rng.integers(0, 6, size=dice_indices.shape)
+
+    def play_chunk(self, matches):
+        shape = (matches, self.total_rounds)
+        computer_choice = self.rng.integers(0, self.total_choices, size=shape)
+        user_guess = self.rng.integers(0, self.total_choices, size=shape)
+        user_first = user_guess == computer_choice
+
+        user_lead = self.user_strategy.choose(self.rng, shape)
+        computer_lead = self.computer_strategy.choose(self.rng, shape)
+        user_dice = np.where(user_first, user_lead, self.user_strategy.respond(self.rng, computer_lead))
+        computer_dice = np.where(user_first, self.computer_strategy.respond(self.rng, user_lead), computer_lead)
+
+        user_roll = self.roll(user_dice)
+        computer_roll = self.roll(computer_dice)
+        user_rounds = np.count_nonzero(user_roll > computer_roll, axis=1)
+        computer_rounds = np.count_nonzero(user_roll < computer_roll, axis=1)
+
+        # Result.display_final_result only awards the match to the user with two round wins.
+        user_matches = int(np.count_nonzero(user_rounds >= 2))
+        wins, losses = int(user_rounds.sum()), int(computer_rounds.sum())
+        return user_matches, wins, losses, matches * self.total_rounds - wins - losses
+
+    def run(self, matches, chunk_size=250000):
+        user_matches = 0
+        round_counts = {"win": 0, "loss": 0, "draw": 0}
+        remaining = matches
+        while remaining > 0:
+            chunk = min(chunk_size, remaining)
+            chunk_matches, wins, losses, draws = self.play_chunk(chunk)
+            user_matches += chunk_matches
+            round_counts["win"] += wins
+            round_counts["loss"] += losses
+            round_counts["draw"] += draws
+            remaining -= chunk
+        return SimulationReport(matches, user_matches, round_counts)
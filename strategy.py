@@ -0,0 +1,79 @@
+import secrets
+from game_dice import ProbabilityCalculator
+
+_system_random = secrets.SystemRandom()
+
+
+class AliasTable:
+    def __init__(self, weights):
+        # Vose's alias method: every column holds at most two outcomes, so a sample costs O(1).
+        self.size = len(weights)
+        total = sum(weights)
+        scaled = [weight * self.size / total for weight in weights]
+        self.probability = [1.0] * self.size
+        self.alias = list(range(self.size))
+        small = [i for i, weight in enumerate(scaled) if weight < 1]
+        large = [i for i, weight in enumerate(scaled) if weight >= 1]
+
+        while small and large:
+            low, high = small.pop(), large.pop()
+            self.probability[low] = scaled[low]
+            self.alias[low] = high
+            scaled[high] -= 1 - scaled[low]
+            (small if scaled[high] < 1 else large).append(high)
+
+    def sample(self):
+        column = secrets.randbelow(self.size)
+        return column if _system_random.random() < self.probability[column] else self.alias[column]
+
+
+def solve_zero_sum(payoff, iterations=20000, tolerance=1e-3):
+    # Fictitious play: each player best-responds to the other's empirical mix. Each iteration
+    # adds one row and one column to running totals, so it costs O(n) rather than O(n^2).
+    size = len(payoff)
+    columns = [list(column) for column in zip(*payoff)]
+    row_counts = [0] * size
+    row_totals = [0.0] * size
+    column_totals = [0.0] * size
+    row = 0
+    upper, lower = 0.0, 0.0
+
+    for played in range(1, iterations + 1):
+        row_counts[row] += 1
+        column_totals = [total + value for total, value in zip(column_totals, payoff[row])]
+        lowest = min(column_totals)
+        column = column_totals.index(lowest)
+        row_totals = [total + value for total, value in zip(row_totals, columns[column])]
+        highest = max(row_totals)
+
+        upper, lower = highest / played, lowest / played
+        if upper - lower < tolerance:
+            break
+        row = row_totals.index(highest)
+
+    return [count / played for count in row_counts], (upper + lower) / 2, upper - lower
+
+
+class StrategyEngine:
+    def __init__(self, dice_list, iterations=20000, tolerance=1e-3, player="computer"):
+        # Scores include the 0-5 offset, so the strategy plays the game as it is actually scored.
+        matrix = ProbabilityCalculator.round_matrix(dice_list)
+        self.size = matrix.size
+        # payoff[i][j] is what die i is worth against the opponent's die j. The user takes the match only
+        # with a majority of round wins (see OutcomeMatrix.match_probability), so a drawn round counts
+        # for the computer: the user plays for its round-win chance, the computer against it.
+        if player == "user":
+            self.payoff = [[int(matrix.wins[i][j]) / matrix.total(i, j) for j in range(self.size)] for i in range(self.size)]
+        else:
+            self.payoff = [[1 - int(matrix.losses[i][j]) / matrix.total(i, j) for j in range(self.size)] for i in range(self.size)]
+        self.best_response = [max(range(self.size), key=lambda i: self.payoff[i][j]) for j in range(self.size)]
+        # The mixed equilibrium assumes both dice are picked without seeing the other. When the computer
+        # picks first the user sees its die (and its roll) before answering, so this only limits how much
+        # a single lead can be exploited.
+        self.equilibrium, self.value, self.gap = solve_zero_sum(self.payoff, iterations, tolerance)
+        self.alias_table = AliasTable(self.equilibrium)
+
+    def choose(self, opponent_index=None):
+        if opponent_index is None:
+            return self.alias_table.sample()
+        return self.best_response[opponent_index]
@@ -0,0 +1,44 @@
+from types import SimpleNamespace
+
+from benchmarks import DEFAULT_DICE_COUNTS, DEFAULT_FACE_COUNTS, compare, grid_cases, is_narrowed
+
+
+def results(**cases):
+    return {"cases": {name: {"seconds": seconds, "peak_bytes": peak} for name, (seconds, peak) in cases.items()}}
+
+
+def test_slower_and_larger_cases_are_regressions():
+    baseline = results(fast=(0.010, 1000), big=(0.010, 1000), same=(0.010, 1000))
+    current = results(fast=(0.020, 1000), big=(0.010, 2000), same=(0.011, 1100))
+    regressions, missing = compare(baseline, current, 0.25, 0.25)
+    assert [regression.split(":")[0] for regression in regressions] == ["fast", "big"]
+    assert missing == []
+
+
+def test_small_absolute_slowdowns_are_ignored():
+    baseline = results(tiny=(0.0010, 1000), slow=(0.100, 1000))
+    current = results(tiny=(0.0018, 1000), slow=(0.200, 1000))
+    regressions, _ = compare(baseline, current, 0.25, 0.25, min_delta=0.001)
+    assert [regression.split(":")[0] for regression in regressions] == ["slow"]
+
+
+def test_cases_missing_from_the_current_run_are_reported():
+    regressions, missing = compare(results(kept=(0.01, 1), renamed=(0.01, 1)), results(kept=(0.01, 1), added=(0.01, 1)), 0.25, 0.25)
+    assert regressions == []
+    assert missing == ["renamed"]
+
+
+def test_grid_cases_respect_coverage_and_limits():
+    limits = SimpleNamespace(max_total_faces=1000, max_table_dice=10)
+    assert grid_cases("generate_hmac", "once", [2, 100], [6, 100], limits) == [(2, 6)]
+    assert grid_cases("calculate_probability", "pair", [2, 100], [6, 100], limits) == [(2, 6), (2, 100)]
+    assert grid_cases("game_match", "grid", [2, 100], [6, 100], limits) == [(2, 6), (100, 6), (2, 100)]
+    assert grid_cases("table_generate", "grid", [2, 100], [6, 100], limits) == [(2, 6), (2, 100)]
+
+
+def test_only_explicit_subsets_count_as_narrowed():
+    full = dict(bench=None, dice=DEFAULT_DICE_COUNTS, faces=DEFAULT_FACE_COUNTS)
+    assert not is_narrowed(SimpleNamespace(**full))
+    assert is_narrowed(SimpleNamespace(**dict(full, bench=["game_match"])))
+    assert is_narrowed(SimpleNamespace(**dict(full, dice=[2])))
+    assert is_narrowed(SimpleNamespace(**dict(full, faces=[6, 100])))
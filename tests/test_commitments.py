@@ -0,0 +1,138 @@
+import pytest
+
+from commitments import (END_RECORD, MATCH_RECORD, ROUND_RECORD, TRANSCRIPT_MAGIC, MerkleCommitments, MerkleTree, TranscriptWriter,
+                         leaf_hash, prove_round, verify_partition, verify_transcript)
+from game_dice import RandomGenerator
+
+
+def play_match(writer, rounds=3, total_choices=4):
+    commitments = MerkleCommitments(RandomGenerator(), writer)
+    commitments.begin_match(rounds, total_choices)
+    for _ in range(rounds):
+        choice, _ = commitments.draw(total_choices)
+        guess = (choice + 1) % total_choices
+        commitments.note_guess(guess)
+        user, _ = commitments.draw(6)
+        computer, _ = commitments.draw(6)
+        commitments.record_round(guess == choice, user, computer)
+    commitments.end_match()
+    return commitments
+
+
+@pytest.fixture
+def transcript(tmp_path):
+    path = tmp_path / "transcript.bin"
+    writer = TranscriptWriter(str(path))
+    commitments = [play_match(writer) for _ in range(2)]
+    writer.close()
+    return path, commitments
+
+
+def round_offsets(data):
+    offsets, offset = [], len(TRANSCRIPT_MAGIC)
+    while offset < len(data):
+        if data[offset:offset + 1] == b"M":
+            offset += MATCH_RECORD.size + MATCH_RECORD.unpack_from(data, offset)[3] * 32
+        elif data[offset:offset + 1] == b"E":
+            offset += END_RECORD.size
+        else:
+            offsets.append(offset)
+            offset += ROUND_RECORD.size
+    return offsets
+
+
+def test_honest_transcript_verifies(transcript):
+    path, _ = transcript
+    assert verify_partition(str(path), 0, 1) == (2, 6, [])
+    assert verify_transcript(str(path), workers=2) == (2, 6, [])
+
+
+def test_inclusion_proofs_check_against_the_root(transcript):
+    path, commitments = transcript
+    match_id = commitments[0].match_id
+    root, proofs = prove_round(str(path), match_id, 1)
+    assert root == commitments[0].tree.root
+    assert [leaf_index for leaf_index, *_ in proofs] == [3, 4, 5]
+    for leaf_index, value, nonce, proof in proofs:
+        assert MerkleTree.verify_proof(root, leaf_hash(match_id, leaf_index, value, nonce), proof)
+
+
+def test_replayed_round_is_rejected(transcript):
+    path, _ = transcript
+    data = bytearray(path.read_bytes())
+    first, second = round_offsets(data)[:2]
+    # Copy round 1's guess, first move and reveals into round 2, keeping round 2's index.
+    data[second + 19:second + ROUND_RECORD.size] = data[first + 19:first + ROUND_RECORD.size]
+    path.write_bytes(bytes(data))
+    _, _, failures = verify_partition(str(path), 0, 1)
+    assert any("instead of #3" in problem for _, problem in failures)
+
+
+def start_short_match(writer):
+    # Plays one of three rounds, then stops, as when the player quits at round 2.
+    commitments = MerkleCommitments(RandomGenerator(), writer)
+    commitments.begin_match(3, 4)
+    choice, _ = commitments.draw(4)
+    commitments.note_guess(choice)
+    commitments.draw(6)
+    commitments.draw(6)
+    commitments.record_round(True, 1, 1)
+    return commitments
+
+
+def test_match_closed_early_verifies(tmp_path):
+    path = tmp_path / "transcript.bin"
+    writer = TranscriptWriter(str(path))
+    start_short_match(writer).end_match()
+    play_match(writer)
+    writer.close()
+    assert verify_partition(str(path), 0, 1) == (2, 4, [])
+
+
+def test_match_without_closing_record_is_flagged(tmp_path):
+    path = tmp_path / "transcript.bin"
+    writer = TranscriptWriter(str(path))
+    commitments = start_short_match(writer)
+    play_match(writer)
+    writer.close()
+    _, _, failures = verify_partition(str(path), 0, 1)
+    assert failures == [(commitments.match_id.hex(), "has no closing record after 1 of 3 rounds")]
+
+
+def test_rounds_after_the_closing_record_are_flagged(tmp_path):
+    path = tmp_path / "transcript.bin"
+    writer = TranscriptWriter(str(path))
+    commitments = start_short_match(writer)
+    match_id = commitments.match_id
+    commitments.end_match()
+    commitments.draw(4)
+    commitments.draw(6)
+    commitments.draw(6)
+    commitments.record_round(False, 1, 1)
+    writer.close()
+    _, _, failures = verify_partition(str(path), 0, 1)
+    assert failures == [(match_id.hex(), "round 1 logged after the match was closed")]
+
+
+def test_out_of_range_guess_is_flagged(tmp_path):
+    path = tmp_path / "transcript.bin"
+    writer = TranscriptWriter(str(path))
+    commitments = MerkleCommitments(RandomGenerator(), writer)
+    commitments.begin_match(1, 4)
+    commitments.draw(4)
+    commitments.draw(6)
+    commitments.draw(6)
+    commitments.note_guess(4)
+    commitments.record_round(False, 0, 0)
+    commitments.end_match()
+    writer.close()
+    _, _, failures = verify_partition(str(path), 0, 1)
+    assert failures == [(commitments.match_id.hex(), "round 0: guess 4 is out of range")]
+
+
+def test_truncated_transcript_raises_value_error(transcript):
+    path, _ = transcript
+    path.write_bytes(path.read_bytes()[:-12])
+    with pytest.raises(ValueError, match="middle of a record"):
+        verify_partition(str(path), 0, 1)
+
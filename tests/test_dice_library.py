@@ -0,0 +1,63 @@
+import os
+import stat
+
+import pytest
+
+from dice_library import DiceLibrary, convert
+from game_dice import GameValidations
+
+DICE_TEXT = "2,2,4,4,9,9 1,1,6,6,8,8\n3,3,5,5,7,7\n-2147483648,0,0,1,1,2147483647\n1,2,3\n"
+
+
+@pytest.fixture
+def library_path(tmp_path):
+    source = tmp_path / "dice.txt"
+    source.write_text(DICE_TEXT)
+    path = tmp_path / "dice.dlib"
+    assert convert(str(source), str(path)) == 5
+    return path
+
+
+def test_library_round_trip(library_path):
+    with DiceLibrary(str(library_path)) as library:
+        assert len(library) == 5
+        assert [list(faces) for faces in library.select(range(5))] == [
+            [int(face) for face in group.split(",")] for group in DICE_TEXT.split()
+        ]
+
+
+def test_validate_reports_short_dice(library_path):
+    with DiceLibrary(str(library_path)) as library:
+        assert list(library.iter_problems()) == [(4, "die 5 has 3 faces, at least 6 are required")]
+
+
+def test_failed_conversion_leaves_no_library(tmp_path):
+    source = tmp_path / "dice.txt"
+    source.write_text("1,2,3,4,5,6\n3,4,x\n")
+    path = tmp_path / "dice.dlib"
+    with pytest.raises(ValueError, match="Line 2"):
+        convert(str(source), str(path))
+    assert list(tmp_path.iterdir()) == [source]
+
+
+def test_failed_conversion_keeps_the_previous_library(library_path, tmp_path):
+    source = tmp_path / "broken.txt"
+    source.write_text("3,4,x\n")
+    with pytest.raises(ValueError):
+        convert(str(source), str(library_path))
+    with DiceLibrary(str(library_path)) as library:
+        assert len(library) == 5
+
+
+def test_library_selection_is_validated(library_path, capsys):
+    dice = GameValidations().validate_library_selection(str(library_path), "1,3")
+    assert [list(faces) for faces in dice] == [[2, 2, 4, 4, 9, 9], [3, 3, 5, 5, 7, 7]]
+    with pytest.raises(SystemExit):
+        GameValidations().validate_library_selection(str(library_path), "1,5")
+    assert "at least 6 faces" in capsys.readouterr().out
+
+
+def test_library_gets_the_default_file_mode(library_path):
+    umask = os.umask(0)
+    os.umask(umask)
+    assert stat.S_IMODE(os.stat(library_path).st_mode) == 0o666 & ~umask
@@ -0,0 +1,94 @@
+import asyncio
+import re
+
+from game_server import PROMPT_MARKER, GameServer
+
+DICE = [[2, 2, 4, 4, 9, 9], [1, 1, 6, 6, 8, 8], [3, 3, 5, 5, 7, 7]]
+
+
+async def play(port, die, matches=2):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    lines, prompts, played = [], [], 0
+    while True:
+        line = (await reader.readline()).decode()
+        if not line:
+            break
+        lines.append(line.rstrip("\n"))
+        if not line.startswith(PROMPT_MARKER):
+            continue
+        prompts.append(line)
+        if "guess" in line:
+            reply = "0"
+        elif "Select dice" in line:
+            reply = die
+        elif "play again" in line:
+            played += 1
+            reply = "y" if played < matches else "n"
+        else:
+            reply = "x"
+        writer.write(f"{reply}\n".encode())
+        await writer.drain()
+    writer.close()
+    return lines, prompts
+
+
+def match_results(lines):
+    # Splits a session's output into matches and checks each final result against its own rounds.
+    results, wins = [], 0
+    for line in lines:
+        if "You win this round" in line:
+            wins += 1
+        elif "You won" in line or "I won" in line:
+            results.append((wins, line))
+            wins = 0
+    return results
+
+
+def run_server(coroutine):
+    async def main():
+        errors = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        server = GameServer(DICE, max_sessions=10, workers=2)
+        listener = await asyncio.start_server(server.handle_session, "127.0.0.1", 0, limit=1 << 20)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            result = await coroutine(port, server)
+        assert errors == []
+        return result, server
+    return asyncio.run(main())
+
+
+def test_concurrent_sessions_follow_the_prompt_protocol():
+    sessions, server = run_server(lambda port, server: asyncio.gather(play(port, "1"), play(port, "2"), play(port, "3")))
+    assert server.completed_sessions == 3
+    assert server.active_sessions == 0
+    for lines, prompts in sessions:
+        assert prompts and all(prompt.startswith(PROMPT_MARKER) for prompt in prompts)
+        assert lines[-1].endswith("Thanks for playing! 👋")
+        results = match_results(lines)
+        assert len(results) == 2
+        for wins, line in results:
+            if wins >= 2:
+                assert f"You won {wins} out of 3 rounds" in line
+            else:
+                assert "I won" in line
+
+
+def test_over_long_lines_end_the_session():
+    async def send_long_line(port, server):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        while not (await reader.readline()).startswith(PROMPT_MARKER.encode()):
+            pass
+        writer.write(b"0" * (2 << 20) + b"\n")
+        try:
+            await writer.drain()
+            await reader.read()
+        except ConnectionError:
+            pass
+        writer.close()
+        while server.completed_sessions < 1:
+            await asyncio.sleep(0.01)
+
+    _, server = run_server(send_long_line)
+    assert server.completed_sessions == 1
+    assert server.active_sessions == 0
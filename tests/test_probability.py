@@ -0,0 +1,102 @@
+from fractions import Fraction
+from itertools import product
+
+import pytest
+
+import game_dice
+from game_dice import Die, ProbabilityCalculator
+
+DICE = [
+    [2, 2, 4, 4, 9, 9],
+    [1, 1, 6, 6, 8, 8],
+    [3, 3, 5, 5, 7, 7],
+    [4, 4, 4, 4, 4, 4],
+    [1, 4, 4, 4, 9, 9, 9],
+    [-3, 0, 0, 12, 12, 12],
+]
+
+
+@pytest.fixture(params=["numpy", "pure"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        if game_dice.np is None:
+            pytest.skip("NumPy is not installed")
+    else:
+        monkeypatch.setattr(game_dice, "np", None)
+    return request.param
+
+
+def brute_force(user_faces, computer_faces):
+    wins = sum(1 for user in user_faces for computer in computer_faces if user > computer)
+    losses = sum(1 for user in user_faces for computer in computer_faces if user < computer)
+    total = len(user_faces) * len(computer_faces)
+    return Fraction(wins, total), Fraction(losses, total), Fraction(total - wins - losses, total)
+
+
+@pytest.mark.parametrize("user", range(len(DICE)))
+@pytest.mark.parametrize("computer", range(len(DICE)))
+def test_exact_probability_matches_brute_force(backend, user, computer):
+    assert ProbabilityCalculator.exact_probability(DICE[user], DICE[computer]) == brute_force(DICE[user], DICE[computer])
+
+
+def test_exact_probability_counts_ties_as_draws(backend):
+    assert ProbabilityCalculator.exact_probability([4] * 6, [4] * 6) == (0, 0, 1)
+    assert ProbabilityCalculator.exact_probability([4, 4, 4, 5, 5, 5], [4] * 6) == (Fraction(1, 2), 0, Fraction(1, 2))
+
+
+def test_simulation_agrees_with_exact_probability(backend):
+    game_dice.random.seed(7)
+    user, computer = DICE[0], DICE[1]
+    simulated = ProbabilityCalculator.calculate_probability(user, computer, trials=20000)
+    exact = ProbabilityCalculator.calculate_probability(user, computer)
+    for simulated_percent, exact_percent in zip(simulated, exact):
+        assert abs(simulated_percent - exact_percent) < 2.0
+
+
+def test_die_histogram_keeps_duplicate_faces(backend):
+    die = Die([5, 1, 5, 3, 5, 1])
+    assert list(die.values) == [1, 3, 5]
+    assert list(die.bounds) == [0, 2, 3, 6]
+    assert sorted(die) == [1, 1, 3, 5, 5, 5]
+
+
+def score_faces(faces):
+    return [face + offset for face in faces for offset in range(6)]
+
+
+def test_win_matrix_matches_brute_force(backend):
+    matrix = ProbabilityCalculator.win_matrix(DICE)
+    for i in range(len(DICE)):
+        for j in range(len(DICE)):
+            assert matrix.exact(i, j) == brute_force(DICE[i], DICE[j])
+
+
+def test_round_matrix_includes_the_offset(backend):
+    matrix = ProbabilityCalculator.round_matrix(DICE)
+    for i in range(len(DICE)):
+        for j in range(len(DICE)):
+            assert matrix.exact(i, j) == brute_force(score_faces(DICE[i]), score_faces(DICE[j]))
+
+
+def test_score_die_handles_spread_out_faces(backend):
+    faces = [0, 1000, 1000, 5000, 5001, 90000]
+    assert sorted(ProbabilityCalculator.score_die(faces)) == sorted(score_faces(faces))
+
+
+def test_match_probability_is_a_majority_of_rounds(backend):
+    matrix = ProbabilityCalculator.round_matrix(DICE)
+    odds = matrix.exact(0, 1)
+    expected = 0
+    # Outcome 0 is a user win; the user needs at least two of the three rounds.
+    for rounds in product(range(3), repeat=3):
+        if rounds.count(0) >= 2:
+            expected += odds[rounds[0]] * odds[rounds[1]] * odds[rounds[2]]
+    assert matrix.match_probability(0, 1) == expected
+    assert abs(matrix.match_percentage(0, 1) - float(expected) * 100) < 1e-9
+
+
+def test_scores_of_the_largest_faces_do_not_overflow(backend):
+    dice = [[1, 2, 3, 4, 5, 2**31 - 1], [-2**31, 2, 3, 4, 5, 6]]
+    assert sorted(ProbabilityCalculator.score_die(dice[0])) == sorted(score_faces(dice[0]))
+    matrix = ProbabilityCalculator.round_matrix(dice)
+    assert matrix.exact(0, 1) == brute_force(score_faces(dice[0]), score_faces(dice[1]))
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from game_dice import DiceSet, ProbabilityCache, ProbabilityCalculator, ProbabilityTable
+
+DICE = [[2, 2, 4, 4, 9, 9], [1, 1, 6, 6, 8, 8], [3, 3, 5, 5, 7, 7]]
+
+
+def dice_sets(dice):
+    return DiceSet(dice).dice_sets
+
+
+def make_cache(tmp_path=None, max_entries=32, include_offsets=True):
+    table = ProbabilityTable(ProbabilityCalculator(), include_offsets=include_offsets)
+    return ProbabilityCache(table, max_entries=max_entries, cache_dir=str(tmp_path) if tmp_path else None)
+
+
+def test_hits_and_misses_are_counted():
+    cache = make_cache()
+    first = cache.get_matrix(dice_sets(DICE))
+    assert cache.get_matrix(dice_sets(DICE)) is first
+    assert cache.stats() == {"hits": 1, "disk_hits": 0, "misses": 1, "entries": 1}
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = make_cache(max_entries=2)
+    sets = [dice_sets(DICE[i:] + DICE[:i]) for i in range(3)]
+    cache.get_matrix(sets[0])
+    cache.get_matrix(sets[1])
+    cache.get_matrix(sets[0])
+    cache.get_matrix(sets[2])
+    assert cache.stats()["entries"] == 2
+    cache.get_matrix(sets[0])
+    assert cache.stats()["misses"] == 3
+    cache.get_matrix(sets[1])
+    assert cache.stats()["misses"] == 4
+
+
+def test_variants_use_separate_keys():
+    sets = dice_sets(DICE)
+    assert ProbabilityCache.cache_key(sets, "scores") != ProbabilityCache.cache_key(sets, "faces")
+    scores = make_cache().get_matrix(sets)
+    faces = make_cache(include_offsets=False).get_matrix(sets)
+    assert scores.exact(0, 1) != faces.exact(0, 1)
+
+
+def test_entries_are_reused_from_disk(tmp_path):
+    expected = make_cache(tmp_path).get_matrix(dice_sets(DICE))
+    cache = make_cache(tmp_path)
+    matrix = cache.get_matrix(dice_sets(DICE))
+    assert cache.stats() == {"hits": 0, "disk_hits": 1, "misses": 0, "entries": 1}
+    assert [matrix.exact(i, j) for i in range(3) for j in range(3)] == [expected.exact(i, j) for i in range(3) for j in range(3)]
+
+
+@pytest.mark.parametrize("content", [
+    "not json",
+    json.dumps({"wins": [[0]], "losses": [[0]], "face_counts": [6]}),
+    json.dumps({"wins": [[0, 0, 0]] * 3, "losses": [[0, 0]] * 3, "face_counts": [6, 6, 6]}),
+    json.dumps({"wins": [[0, 0, 0]] * 3, "losses": [[0, 0, 0]] * 3}),
+    json.dumps([1, 2, 3]),
+])
+def test_corrupt_disk_entries_are_recomputed(tmp_path, content):
+    sets = dice_sets(DICE)
+    cache = make_cache(tmp_path)
+    (tmp_path / f"{ProbabilityCache.cache_key(sets, 'scores')}.json").write_text(content)
+    matrix = cache.get_matrix(sets)
+    assert cache.stats()["misses"] == 1
+    assert matrix.exact(0, 1) == ProbabilityCalculator.round_matrix(DICE).exact(0, 1)
@@ -0,0 +1,27 @@
+from game_dice import DiceSet, ProbabilityCalculator, ProbabilityTable
+
+DICE = DiceSet([[2, 2, 4, 4, 9, 9], [1, 1, 6, 6, 8, 8], [3, 3, 5, 5, 7, 7], [1, 2, 3, 4, 5, 6]]).dice_sets
+
+
+def test_plain_rows_have_fixed_width_and_no_ansi_codes():
+    table = ProbabilityTable(ProbabilityCalculator(), color=False)
+    text = table.generate(DICE)
+    assert "\x1b" not in text
+    assert len({len(line) for line in text.splitlines()}) == 1
+    assert text == "\n".join(table.iter_rows(DICE))
+
+
+def test_pages_select_rows_and_columns():
+    table = ProbabilityTable(ProbabilityCalculator(), color=False)
+    header, *rows = table.iter_rows(DICE, range(2, 4), range(1, 3))
+    assert header.splitlines()[1].split("|")[2:4] == [f" {2:<{table.cell_width}} ", f" {3:<{table.cell_width}} "]
+    assert [row.splitlines()[0].split("|")[1].strip() for row in rows] == [str(DICE[2]), str(DICE[3])]
+
+
+def test_counters_are_ranked_by_round_win_probability():
+    table = ProbabilityTable(ProbabilityCalculator(), color=False)
+    matrix = table.compute_matrix(DICE)
+    title, *lines = table.iter_counters(DICE, 0, k=2, matrix=matrix)
+    assert title.startswith("Best 2 counters against die 1")
+    ranked = sorted((j for j in range(1, 4)), key=lambda j: -matrix.exact(j, 0)[0])[:2]
+    assert [int(line.split("Die ")[1].split()[0]) - 1 for line in lines] == ranked
@@ -0,0 +1,57 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from game_dice import ProbabilityCalculator
+from simulation import MatchSimulator, SimulationReport, wilson_interval
+
+DICE = [[2, 2, 4, 4, 9, 9], [1, 1, 6, 6, 8, 8], [3, 3, 5, 5, 7, 7], [0, 1, 2, 10, 11, 12]]
+MATCHES = 40000
+
+
+def match_odds(win):
+    return win ** 3 + 3 * win ** 2 * (1 - win)
+
+
+def expected_round_win(user_strategy):
+    # Each round's dice are chosen independently, so the round win chance is a fixed mixture
+    # and the match is a best-of-3 over that chance.
+    matrix = ProbabilityCalculator.round_matrix(DICE)
+    win = lambda i, j: float(matrix.exact(i, j)[0])
+    size = len(DICE)
+    uniform = sum(win(i, j) for i in range(size) for j in range(size)) / size ** 2
+    if user_strategy == "uniform":
+        return uniform
+    if user_strategy == "counter":
+        # The user picks second, and answers with the best counter, unless their guess was right (1 in 4).
+        counter = sum(max(win(i, j) for i in range(size)) for j in range(size)) / size
+        return uniform / 4 + counter * 3 / 4
+    return sum(win(1, j) for j in range(size)) / size
+
+
+@pytest.mark.parametrize("user_strategy", ["uniform", "counter", "fixed:2"])
+def test_simulated_rates_match_exact_odds(user_strategy):
+    report = MatchSimulator(DICE, user_strategy, "uniform", seed=3).run(MATCHES, chunk_size=7000)
+    win = expected_round_win(user_strategy)
+    rounds = sum(report.round_counts.values())
+    low, high = wilson_interval(report.round_counts["win"], rounds)
+    assert low <= win <= high
+    low, high = report.confidence_interval()
+    assert low <= match_odds(win) <= high
+
+
+def test_fixed_dice_match_the_round_matrix():
+    report = MatchSimulator(DICE, "fixed:1", "fixed:2", seed=5).run(MATCHES)
+    matrix = ProbabilityCalculator.round_matrix(DICE)
+    rounds = sum(report.round_counts.values())
+    for outcome, exact in zip(("win", "loss", "draw"), matrix.exact(0, 1)):
+        low, high = wilson_interval(report.round_counts[outcome], rounds)
+        assert low <= exact <= high
+    low, high = report.confidence_interval()
+    assert low <= matrix.match_probability(0, 1) <= high
+
+
+def test_empty_report_does_not_divide_by_zero():
+    report = SimulationReport(0, 0, {"win": 0, "loss": 0, "draw": 0})
+    assert report.user_win_rate() == 0.0
+    assert "Matches played: 0" in str(report)
@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from game_dice import ProbabilityCalculator
+from strategy import AliasTable, StrategyEngine, solve_zero_sum
+
+
+def random_dice(seed, dice_count=12):
+    generator = random.Random(seed)
+    return [[generator.randrange(20) for _ in range(6)] for _ in range(dice_count)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_computer_best_response_minimises_the_users_round_wins(seed):
+    dice = random_dice(seed)
+    matrix = ProbabilityCalculator.round_matrix(dice)
+    engine = StrategyEngine(dice)
+    for j in range(len(dice)):
+        # matrix.exact(i, j)[1] is the chance that die j beats die i in a round.
+        user_wins = [matrix.exact(i, j)[1] for i in range(len(dice))]
+        assert user_wins[engine.best_response[j]] == min(user_wins)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_user_best_response_maximises_the_users_round_wins(seed):
+    dice = random_dice(seed)
+    matrix = ProbabilityCalculator.round_matrix(dice)
+    engine = StrategyEngine(dice, player="user")
+    for j in range(len(dice)):
+        user_wins = [matrix.exact(i, j)[0] for i in range(len(dice))]
+        assert user_wins[engine.best_response[j]] == max(user_wins)
+
+
+@pytest.mark.parametrize("weights", [[1, 1, 1], [5, 1, 2, 0, 8], [3], [1, 2, 3, 4, 5, 6, 7]])
+def test_alias_table_preserves_the_weights(weights):
+    table = AliasTable(weights)
+    # Column c yields c with probability[c] and alias[c] otherwise, each column chosen with chance 1/size.
+    mass = [0.0] * len(weights)
+    for column in range(table.size):
+        mass[column] += table.probability[column] / table.size
+        mass[table.alias[column]] += (1 - table.probability[column]) / table.size
+    for outcome, weight in enumerate(weights):
+        assert mass[outcome] == pytest.approx(weight / sum(weights))
+
+
+def test_alias_table_samples_only_weighted_outcomes():
+    table = AliasTable([0, 3, 0, 1])
+    assert {table.sample() for _ in range(1000)} <= {1, 3}
+
+
+def test_rock_paper_scissors_equilibrium_is_uniform():
+    payoff = [[0, -1, 1], [1, 0, -1], [-1, 1, 0]]
+    equilibrium, value, gap = solve_zero_sum(payoff, iterations=200000, tolerance=1e-3)
+    assert gap < 1e-3
+    assert value == pytest.approx(0, abs=1e-3)
+    assert equilibrium == pytest.approx([1 / 3] * 3, abs=0.01)
+
+
+def test_dominant_die_is_always_played():
+    engine = StrategyEngine([[10, 10, 10, 10, 10, 10], [1, 2, 3, 4, 5, 6], [2, 2, 2, 2, 2, 2]])
+    assert engine.equilibrium[0] == pytest.approx(1)
+    assert engine.best_response == [0, 0, 0]
@@ -0,0 +1,43 @@
+import io
+import json
+
+from tournament import DominanceGraph, Tournament, load_dice_file
+
+# Dice 0-2 beat each other in a cycle; die 3 loses to all of them.
+DICE = [[2, 2, 4, 4, 9, 9], [1, 1, 6, 6, 8, 8], [3, 3, 5, 5, 7, 7], [0, 0, 0, 0, 0, 0]]
+
+
+def cycle_graph():
+    graph = DominanceGraph(5)
+    for winner, loser in [(0, 1), (1, 2), (2, 0), (0, 3), (1, 3), (2, 3), (3, 4), (0, 4)]:
+        graph.add_edge(winner, loser)
+    return graph
+
+
+def test_strongly_connected_components_split_off_dominated_dice():
+    components = sorted(cycle_graph().strongly_connected_components())
+    assert components == [[0, 1, 2], [3], [4]]
+
+
+def test_three_cycles_are_reported_once():
+    assert list(cycle_graph().three_cycles()) == [(0, 1, 2)]
+
+
+def test_copeland_scores_count_wins_minus_losses():
+    assert cycle_graph().copeland_scores() == [2, 1, 1, -2, -2]
+
+
+def test_tournament_finds_the_cycle_and_ranks_the_dominated_die_last():
+    output = io.StringIO()
+    Tournament(DICE, workers=1, block_size=2).run(output)
+    records = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [record["dice"] for record in records if record["type"] == "component"] == [[1, 2, 3]]
+    assert [record["dice"] for record in records if record["type"] == "cycle"] == [[1, 2, 3]]
+    ranking = [record["die"] for record in records if record["type"] == "ranking"]
+    assert ranking[-1] == 4
+
+
+def test_dice_files_allow_several_dice_per_line(tmp_path):
+    path = tmp_path / "dice.txt"
+    path.write_text("2,2,4,4,9,9 1,1,6,6,8,8\n\n3,3,5,5,7,7\n")
+    assert load_dice_file(str(path)) == ["2,2,4,4,9,9", "1,1,6,6,8,8", "3,3,5,5,7,7"]
@@ -0,0 +1,21 @@
+import pytest
+
+from game_dice import GameValidations
+
+
+def test_valid_dice_are_parsed():
+    assert GameValidations().validate_dice_input(["1,2,3,4,5,6", "-2,2,2,2,2,9"]) == [[1, 2, 3, 4, 5, 6], [-2, 2, 2, 2, 2, 9]]
+
+
+@pytest.mark.parametrize("dice", [
+    ["1,2,3,4,5,6"],
+    ["1,2,3,4,5,6", "1,2,3"],
+    ["1,2,3,4,5,6", "1,2,3,4,5,x"],
+    ["1,2,3,4,5,2147483648", "1,2,3,4,5,6"],
+    ["1,2,3,4,5,6", "-2147483649,2,3,4,5,6"],
+])
+def test_invalid_dice_exit_with_an_error(dice, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        GameValidations().validate_dice_input(dice)
+    assert exit_info.value.code == 1
+    assert capsys.readouterr().out.startswith("Error: ")
@@ -0,0 +1,214 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dice_library import LIBRARY_MAGIC
+from game_dice import DiceSet, GameValidations, ProbabilityCalculator, np
+
+_worker_dice = None
+
+
+def _init_worker(dice):
+    global _worker_dice
+    if np is not None:
+        _worker_dice = ProbabilityCalculator.pack_faces(dice)
+    else:
+        _worker_dice = dice
+
+
+def _column(j):
+    if np is not None:
+        below, above = ProbabilityCalculator.column_counts(_worker_dice, j)
+        return below.tolist(), above.tolist()
+
+    below, above = [], []
+    for die in _worker_dice[j:]:
+        wins, losses, _ = ProbabilityCalculator.count_outcomes(die, _worker_dice[j])
+        below.append(wins)
+        above.append(losses)
+    return below, above
+
+
+def play_block(start, end):
+    # Each row j is only compared with dice after it, so a block covers its share of the upper triangle.
+    edges = []
+    for j in range(start, end):
+        below, above = _column(j)
+        for offset in range(1, len(below)):
+            i = j + offset
+            if below[offset] > above[offset]:
+                edges.append((i, j))
+            elif below[offset] < above[offset]:
+                edges.append((j, i))
+    return start, end, edges
+
+
+def iter_bits(mask):
+    while mask:
+        lowest = mask & -mask
+        yield lowest.bit_length() - 1
+        mask ^= lowest
+
+
+class DominanceGraph:
+    def __init__(self, dice_count):
+        self.dice_count = dice_count
+        self.beats = [0] * dice_count
+        self.beaten_by = [0] * dice_count
+
+    def add_edge(self, winner, loser):
+        self.beats[winner] |= 1 << loser
+        self.beaten_by[loser] |= 1 << winner
+
+    def copeland_scores(self):
+        return [bin(self.beats[i]).count("1") - bin(self.beaten_by[i]).count("1") for i in range(self.dice_count)]
+
+    def three_cycles(self):
+        # Each cycle is reported once, starting from its smallest die.
+        for i in range(self.dice_count):
+            higher = ~((1 << (i + 1)) - 1)
+            for j in iter_bits(self.beats[i] & higher):
+                for k in iter_bits(self.beats[j] & self.beaten_by[i] & higher):
+                    yield i, j, k
+
+    def strongly_connected_components(self):
+        index_of, lowlink = {}, {}
+        on_stack, stack, components = set(), [], []
+        counter = 0
+
+        for root in range(self.dice_count):
+            if root in index_of:
+                continue
+            work = [(root, iter_bits(self.beats[root]))]
+            index_of[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                node, neighbours = work[-1]
+                advanced = False
+                for neighbour in neighbours:
+                    if neighbour not in index_of:
+                        index_of[neighbour] = lowlink[neighbour] = counter
+                        counter += 1
+                        stack.append(neighbour)
+                        on_stack.add(neighbour)
+                        work.append((neighbour, iter_bits(self.beats[neighbour])))
+                        advanced = True
+                        break
+                    if neighbour in on_stack:
+                        lowlink[node] = min(lowlink[node], index_of[neighbour])
+                if advanced:
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index_of[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+        return components
+
+
+class Tournament:
+    def __init__(self, dice_sets, workers=None, block_size=64):
+        self.dice_manager = DiceSet(dice_sets)
+        self.dice = list(self.dice_manager.dice_sets.values())
+        self.workers = workers or os.cpu_count() or 1
+        self.block_size = block_size
+
+    def run(self, output, max_cycles=1000):
+        dice_count = self.dice_manager.dice_count
+        graph = DominanceGraph(dice_count)
+        blocks = iter([(start, min(start + self.block_size, dice_count)) for start in range(0, dice_count, self.block_size)])
+
+        with ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(self.dice,)) as executor:
+            # Keep only a couple of blocks per worker in flight so finished results are written out promptly.
+            pending = set()
+            for start, end in blocks:
+                pending.add(executor.submit(play_block, start, end))
+                if len(pending) >= self.workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    self._write_blocks(done, graph, output)
+            done, _ = wait(pending)
+            self._write_blocks(done, graph, output)
+
+        for component in graph.strongly_connected_components():
+            if len(component) > 1:
+                self._write(output, {"type": "component", "dice": [die + 1 for die in component]})
+
+        for count, cycle in enumerate(graph.three_cycles()):
+            if count >= max_cycles:
+                self._write(output, {"type": "cycles_truncated", "limit": max_cycles})
+                break
+            self._write(output, {"type": "cycle", "dice": [die + 1 for die in cycle]})
+
+        scores = graph.copeland_scores()
+        ranking = sorted(range(dice_count), key=lambda die: (-scores[die], die))
+        for rank, die in enumerate(ranking, start=1):
+            self._write(output, {"type": "ranking", "rank": rank, "die": die + 1, "copeland": scores[die]})
+        return graph
+
+    def _write_blocks(self, futures, graph, output):
+        for future in futures:
+            start, end, edges = future.result()
+            for winner, loser in edges:
+                graph.add_edge(winner, loser)
+            self._write(output, {"type": "block", "rows": [start + 1, end], "edges": [[winner + 1, loser + 1] for winner, loser in edges]})
+
+    @staticmethod
+    def _write(output, record):
+        output.write(json.dumps(record, separators=(",", ":")) + "\n")
+        output.flush()
+
+
+def load_dice_file(path):
+    # Same format as dice_library.convert: dice separated by spaces or new lines.
+    with open(path) as dice_file:
+        return [group for line in dice_file for group in line.split()]
+
+
+def is_dice_library(path):
+    with open(path, "rb") as dice_file:
+        return dice_file.read(len(LIBRARY_MAGIC)) == LIBRARY_MAGIC
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description='Rank a dice library and find its non-transitive cycles')
+    parser.add_argument('dice_file', help='Binary dice library, or a text file of comma-separated dice separated by spaces or new lines')
+    parser.add_argument('--workers', type=int, help='Number of worker processes (defaults to the CPU count)')
+    parser.add_argument('--block-size', type=int, default=64, help='Rows of the dominance matrix per work item')
+    parser.add_argument('--max-cycles', type=int, default=1000, help='Maximum number of 3-cycles to report')
+    parser.add_argument('--output', help='Write JSON lines to this file instead of stdout')
+    args = parser.parse_args()
+
+    if args.block_size < 1 or (args.workers is not None and args.workers < 1):
+        print("Error: --block-size and --workers must be at least 1.")
+        sys.exit(1)
+
+    validations = GameValidations()
+    try:
+        if is_dice_library(args.dice_file):
+            dice_sets = validations.validate_library_selection(args.dice_file, None)
+        else:
+            dice_sets = validations.validate_dice_input(load_dice_file(args.dice_file))
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    tournament = Tournament(dice_sets, workers=args.workers, block_size=args.block_size)
+    if args.output:
+        with open(args.output, "w") as output:
+            tournament.run(output, max_cycles=args.max_cycles)
+    else:
+        tournament.run(sys.stdout, max_cycles=args.max_cycles)